@@ -1,6 +1,7 @@
 """Import core names of Scrappybara.
 import scrappybara as sb
 """
+from scrappybara.pipeline.async_pipeline import AsyncPipeline
 from scrappybara.pipeline.document import Document
 from scrappybara.pipeline.pipeline import Pipeline
 
@@ -4,12 +4,16 @@ if __name__ == "__main__":
     from scrappybara.cli.extract_items import extract_items
     from scrappybara.cli.extract_classes import extract_classes
     from scrappybara.cli.extract_forms import extract_forms
+    from scrappybara.cli.export_models import export_models
+    from scrappybara.cli.serve import serve
 
     commands = {
         'download': download,
         'extract_classes': extract_classes,
         'extract_items': extract_items,
         'extract_forms': extract_forms,
+        'export_models': export_models,
+        'serve': serve,
     }
 
     if len(sys.argv) == 1:
@@ -0,0 +1,17 @@
+import os
+
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
+
+from scrappybara.syntax.charset import Charset
+from scrappybara.syntax.models import PTagsModel, PDepsModel, TransModel
+from scrappybara.utils.timer import Timer
+
+
+def export_models():
+    """Exports the parser's models as SavedModels, loaded by Pipeline(parser_backend='saved_model')"""
+    timer = Timer()
+    charset_size = len(Charset().load())
+    for model_class in [PTagsModel, PDepsModel, TransModel]:
+        print('Exporting %s...' % model_class.__name__)
+        model_class(charset_size).load().export()
+    print('Exported models in {}'.format(timer.total_time))
@@ -7,6 +7,7 @@ from lxml import etree
 
 import scrappybara.config as cfg
 from scrappybara.preprocessing.tokenizer import Tokenizer
+from scrappybara.semantics.form_index import FormIndex
 from scrappybara.utils.files import bz2_file_bytes_reader, files_in_dir, load_set_from_txt_file, \
     load_dict_from_txt_file, txt_file_writer, txt_file_reader, path_exists, save_pkl_file
 from scrappybara.utils.mutables import add_in_dict_set, reverse_dict
@@ -294,4 +295,5 @@ def extract_forms(resources_dir):
             report.write('%s\t%d\t%s\n' % (form, len(eids), str({eid_title[eid] for eid in eids})))
     # Release to Data
     save_pkl_file(form_eids, cfg.DATA_DIR / 'entities' / 'form_eids.pkl')
+    FormIndex().save(form_eids)
     print('Extracted {:,} forms in total in {}'.format(len(form_eids), timer.total_time))
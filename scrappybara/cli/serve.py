@@ -0,0 +1,163 @@
+import http.server
+import json
+import socketserver
+import threading
+import time
+
+import scrappybara.config as cfg
+from scrappybara.utils.micro_batcher import MicroBatcher
+
+
+def _entity_to_json(entity):
+    return {'id': entity.id, 'uri': entity.uri, 'form': entity.form, 'boundaries': list(entity.boundaries)}
+
+
+class _Metrics(object):
+    """Thread-safe counters of the server"""
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__start_time = time.time()
+        self.__nb_requests = 0
+        self.__nb_errors = 0
+        self.__nb_texts = 0
+        self.__total_latency = 0.
+
+    def record(self, nb_texts, latency, error=False):
+        with self.__lock:
+            self.__nb_requests += 1
+            self.__nb_errors += error
+            self.__nb_texts += nb_texts
+            self.__total_latency += latency
+
+    def to_json(self):
+        with self.__lock:
+            return {
+                'uptime': time.time() - self.__start_time,
+                'requests': self.__nb_requests,
+                'errors': self.__nb_errors,
+                'texts': self.__nb_texts,
+                'mean_latency': self.__total_latency / self.__nb_requests if self.__nb_requests else 0.,
+            }
+
+
+class _RequestHandler(http.server.BaseHTTPRequestHandler):
+    """Endpoints:
+      * POST /process: {"texts": [...]} => {"documents": [{"entities": [...]}, ...]}
+      * GET /health
+      * GET /metrics
+    """
+
+    def __send_json(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def __read_body_size(self):
+        """Returns the size in bytes of the request body, -1 if Content-Length is missing or invalid"""
+        value = self.headers.get('Content-Length', '').strip()
+        return int(value) if value.isdecimal() else -1
+
+    def __read_texts(self, body_size):
+        """Returns the list of texts of the request, None if it's invalid"""
+        try:
+            body = json.loads(self.rfile.read(body_size).decode('utf-8'))
+        except ValueError:
+            return None
+        texts = body.get('texts') if isinstance(body, dict) else None
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            return None
+        return texts
+
+    def do_GET(self):
+        if self.path == '/health':
+            self.__send_json(200, {'status': 'ok'})
+        elif self.path == '/metrics':
+            self.__send_json(200, self.server.metrics)
+        else:
+            self.__send_json(404, {'error': 'Unknown path: %s' % self.path})
+
+    def do_POST(self):
+        if self.path != '/process':
+            self.__send_json(404, {'error': 'Unknown path: %s' % self.path})
+            return
+        body_size = self.__read_body_size()
+        if body_size < 0:
+            self.__send_json(400, {'error': 'Content-Length must be a non-negative integer'})
+            return
+        if body_size > self.server.max_body_size:
+            self.__send_json(413, {'error': 'Body is larger than %d bytes' % self.server.max_body_size})
+            return
+        texts = self.__read_texts(body_size)
+        if texts is None:
+            self.__send_json(400, {'error': 'Body must be a JSON object with a list of strings under "texts"'})
+            return
+        start_time = time.time()
+        try:
+            docs = self.server.process(texts)
+        except Exception as exception:
+            self.server.record(len(texts), time.time() - start_time, error=True)
+            self.__send_json(500, {'error': repr(exception)})
+            return
+        self.server.record(len(texts), time.time() - start_time)
+        self.__send_json(200, {'documents': [{'entities': [_entity_to_json(entity) for entity in doc.entities]}
+                                             for doc in docs]})
+
+
+class InferenceServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    """HTTP server of a pipeline, one thread per request.
+    Texts of concurrent requests are coalesced into micro-batches.
+    """
+    daemon_threads = True
+
+    def __init__(self, pipeline, host=cfg.SERVER_HOST, port=cfg.SERVER_PORT, max_batch_size=cfg.MICRO_BATCH_SIZE,
+                 max_wait=cfg.MICRO_BATCH_WAIT, max_body_size=cfg.SERVER_MAX_BODY_SIZE):
+        """Arg pipeline is a Pipeline, or any callable that returns a list of documents from a list of texts"""
+        super().__init__((host, port), _RequestHandler)
+        self.max_body_size = max_body_size
+        self.__pipeline = pipeline
+        self.__batcher = MicroBatcher(pipeline, max_batch_size, max_wait)
+        self.__metrics = _Metrics()
+
+    def process(self, texts):
+        """Returns a list of documents"""
+        futures = [self.__batcher.submit(text) for text in texts]
+        return [future.result() for future in futures]
+
+    def record(self, nb_texts, latency, error=False):
+        self.__metrics.record(nb_texts, latency, error)
+
+    @property
+    def metrics(self):
+        metrics = self.__metrics.to_json()
+        metrics['batcher'] = self.__batcher.stats
+        if hasattr(self.__pipeline, 'cache_stats'):
+            metrics['caches'] = self.__pipeline.cache_stats
+        return metrics
+
+    def server_close(self):
+        super().server_close()
+        self.__batcher.close()
+
+
+def serve(port=cfg.SERVER_PORT, host=cfg.SERVER_HOST, max_batch_size=cfg.MICRO_BATCH_SIZE,
+          max_wait=cfg.MICRO_BATCH_WAIT, gpu_batch_size=-1, max_body_size=cfg.SERVER_MAX_BODY_SIZE):
+    """Serves a pipeline over HTTP until interrupted.
+    Args are strings when passed from the command line:
+    serve [port] [host] [max_batch_size] [max_wait] [gpu_batch_size] [max_body_size]
+    """
+    from scrappybara.pipeline.pipeline import Pipeline
+
+    with Pipeline(gpu_batch_size=int(gpu_batch_size)) as pipeline:
+        server = InferenceServer(pipeline, host, int(port), int(max_batch_size), float(max_wait),
+                                 int(max_body_size))
+        print('Serving on http://%s:%d' % server.server_address[:2])
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -14,6 +14,38 @@ DATA_VERSION = '0.3.0'
 
 NB_PROCESSES = multiprocessing.cpu_count()
 
+# Backend of each CPU-bound stage of the pipeline: 'inline', 'thread' or 'process'
+PIPELINE_BACKENDS = {
+    'sentencize': 'thread',
+    'process_sentence': 'thread',
+    'link': 'thread',
+}
+
+# Maximum number of micro-batches waiting between two consecutive stages of the pipeline
+PIPELINE_QUEUE_SIZE = 2
+
+# Single texts submitted concurrently to an AsyncPipeline are processed together, in batches of at most this size
+MICRO_BATCH_SIZE = 64  # Texts
+MICRO_BATCH_WAIT = .01  # Seconds a text waits for others before its batch is processed
+
+# Address of the HTTP inference server
+SERVER_HOST = '127.0.0.1'
+SERVER_PORT = 8000
+SERVER_MAX_BODY_SIZE = 2 ** 24  # Bytes of a request body
+
+# ###############################################################################
+# CACHING
+# ###############################################################################
+
+# Maximum number of entries memoized by each component
+WORDSET_CACHE_SIZE = 2 ** 18  # Tokens
+STANDARDIZER_CACHE_SIZE = 2 ** 16  # Tokens
+LEMMATIZER_CACHE_SIZE = 2 ** 16  # Tuples (word, tag)
+PARSER_CACHE_SIZE = 2 ** 16  # Sentences
+
+# Maximum size of the persistent cache of documents
+RESULT_CACHE_SIZE = 2 ** 30  # Bytes
+
 # ###############################################################################
 # FILES
 # ###############################################################################
@@ -33,3 +65,8 @@ WORD_VECTOR_SIZE = 100
 
 PADDED_SENT_LENGTH = MAX_SENT_LENGTH + 2
 PADDED_WORD_LENGTH = MAX_WORD_LENGTH + 2
+
+# Runtime of the parser's models: 'keras' builds them from their weights, 'saved_model' loads exported graphs,
+# 'numpy' evaluates them with NumPy only, on CPU, without importing TensorFlow
+PARSER_BACKENDS = {'keras', 'saved_model', 'numpy'}
+PARSER_BACKEND = 'keras'
@@ -1,5 +1,7 @@
+import scrappybara.config as cfg
 from scrappybara.normalization.suffixes import Suffix
 from scrappybara.syntax.tags import Tag, NOUN_TAGS
+from scrappybara.utils.cache import LRUCache
 from scrappybara.utils.text import ends_with_consonant, token_start, token_prefix, vowel_double_consonant_endings
 
 
@@ -19,7 +21,7 @@ class Lemmatizer(object):
     __bare_men = {'acumen'}
 
     def __init__(self, language_model, adjs, preterit_lemma, pp_lemma, plural_lemma, comparative_lemma,
-                 superlative_lemma, lemma_pp):
+                 superlative_lemma, lemma_pp, cache_size=cfg.LEMMATIZER_CACHE_SIZE):
         self.__lm = language_model
         self.__adjs = adjs
         self.__preterit_lemma = preterit_lemma
@@ -28,9 +30,22 @@ class Lemmatizer(object):
         self.__comparative_lemma = comparative_lemma
         self.__superlative_lemma = superlative_lemma
         self.__lemma_pp = lemma_pp
+        self.__cache = LRUCache(cache_size)  # (word, tag) => (lemma, suffix)
 
     def __call__(self, word, tag):
         """Returns lemma & suffix (can be None)"""
+        try:
+            return self.__cache[(word, tag)]
+        except KeyError:
+            lemma_suffix = self.__lemmatize(word, tag)
+            self.__cache[(word, tag)] = lemma_suffix
+            return lemma_suffix
+
+    @property
+    def cache_stats(self):
+        return self.__cache.stats
+
+    def __lemmatize(self, word, tag):
 
         # FULL MATCH
         # -------------------------------------------------------------------------->
@@ -1,13 +1,29 @@
 import re
 
+import scrappybara.config as cfg
+from scrappybara.utils.cache import LRUCache
 
-def _split_token(token, middles, endings):
-    """Returns start, middle & end of token.
+
+def _split_pattern(middles, endings):
+    """Pattern matching start, middle & end of a token.
     If searching only for middles, pass the empty string '' in the endings list.
     (and vice versa if searching only for endings)
     """
-    pattern = re.compile(r'([a-z]+)(%s)(%s)' % ('|'.join(middles), '|'.join(endings)), re.I)
-    match = re.fullmatch(pattern, token)
+    return re.compile(r'([a-z]+)(%s)(%s)' % ('|'.join(middles), '|'.join(endings)), re.I)
+
+
+# Patterns are compiled once, at import
+_RE_LETTERS = re.compile(r'[a-z]+', re.I)  # Only tokens made of letters can be split
+_RE_OUR = _split_pattern(['our', 'or'], ['ing', 'ed', 's', ''])
+_RE_YSE = _split_pattern(['ys', 'yz', 'is', 'iz'], ['ations', 'ation', 'ers', 'er', 'ing', 'ed', 'es', 'e'])
+_RE_CE = _split_pattern(['c', 's'], ['ives', 'ive', 'es', 'e'])
+_RE_OGUE = _split_pattern(['og', 'ogue'], ['s', ''])
+_RE_ELL = _split_pattern(['el', 'ell'], ['ing', 'ers', 'ed', 'er'])
+
+
+def _split_token(token, pattern):
+    """Returns start, middle & end of token"""
+    match = pattern.fullmatch(token)
     if match:
         start, middle, end = match.group(1, 2, 3)
         if len(start) > 1:
@@ -17,16 +33,49 @@ def _split_token(token, middles, endings):
 
 class Standardizer(object):
 
-    def __init__(self, language_model):
+    def __init__(self, language_model, cache_size=cfg.STANDARDIZER_CACHE_SIZE):
         self.__lm = language_model
+        self.__cache = LRUCache(cache_size)  # token => standard token
 
     def __call__(self, token):
         """Standardizes orthography according to language model"""
+        try:
+            return self.__cache[token]
+        except KeyError:
+            standard = self.__standardize(token)
+            self.__cache[token] = standard
+            return standard
+
+    @property
+    def cache_stats(self):
+        return self.__cache.stats
+
+    def __standardize(self, token):
         token = token.lower()
         if self.__lm.has_ngram(token, 5):
             return token
+        if _RE_LETTERS.fullmatch(token):
+            standard = self.__standardize_split(token)
+            if standard is not None:
+                return standard
+        # leukaemia or leukemia ?
+        if len(token) > 4 and token.find('ae') > -1:
+            best_lemma = self.__lm.best_ngram(token.replace('ae', 'e'), token)
+            if best_lemma is not None:
+                return best_lemma
+        # oestrogen or estrogen ?
+        if len(token) > 4 and token.find('oe') > -1:
+            best_lemma = self.__lm.best_ngram(token.replace('oe', 'e'), token)
+            if best_lemma is not None:
+                return best_lemma
+        return token
+
+    def __standardize_split(self, token):
+        """Splits token into start, middle & end to find its standard orthography.
+        Returns None if no split is found in the language model.
+        """
         # col-our-ed or col-o-red ?
-        start_mid_end = _split_token(token, ['our', 'or'], ['ing', 'ed', 's', ''])
+        start_mid_end = _split_token(token, _RE_OUR)
         if start_mid_end is not None:
             start, _, end = start_mid_end
             if len(start) > 2:
@@ -34,9 +83,7 @@ class Standardizer(object):
                 if best_lemma is not None:
                     return best_lemma + end
         # standard-ys-e or standard-yz-e ?
-        mids = ['ys', 'yz', 'is', 'iz']
-        ends = ['ations', 'ation', 'ers', 'er', 'ing', 'ed', 'es', 'e']
-        start_mid_end = _split_token(token, mids, ends)
+        start_mid_end = _split_token(token, _RE_YSE)
         if start_mid_end is not None:
             start, mid, end = start_mid_end
             if len(start) > 2:
@@ -44,7 +91,7 @@ class Standardizer(object):
                 if best_lemma is not None:
                     return best_lemma[:-1] + end
         # defen-c-es or defen-s-es ?
-        start_mid_end = _split_token(token, ['c', 's'], ['ives', 'ive', 'es', 'e'])
+        start_mid_end = _split_token(token, _RE_CE)
         if start_mid_end is not None:
             start, _, end = start_mid_end
             if len(start) > 2:
@@ -52,7 +99,7 @@ class Standardizer(object):
                 if best_lemma is not None:
                     return best_lemma[:-1] + end
         # catal-og-s or catal-ogue-s ?
-        start_mid_end = _split_token(token, ['og', 'ogue'], ['s', ''])
+        start_mid_end = _split_token(token, _RE_OGUE)
         if start_mid_end is not None:
             start, _, end = start_mid_end
             if len(start) > 2:
@@ -60,21 +107,11 @@ class Standardizer(object):
                 if best_lemma is not None:
                     return best_lemma + end
         # trav-el-ed or trav-el-led ?
-        start_mid_end = _split_token(token, ['el', 'ell'], ['ing', 'ers', 'ed', 'er'])
+        start_mid_end = _split_token(token, _RE_ELL)
         if start_mid_end is not None:
             start, _, end = start_mid_end
             if len(start) > 2:
                 best_lemma = self.__lm.best_ngram(start + 'el' + end, start + 'ell' + end)
                 if best_lemma is not None:
                     return best_lemma
-        # leukaemia or leukemia ?
-        if len(token) > 4 and token.find('ae') > -1:
-            best_lemma = self.__lm.best_ngram(token.replace('ae', 'e'), token)
-            if best_lemma is not None:
-                return best_lemma
-        # oestrogen or estrogen ?
-        if len(token) > 4 and token.find('oe') > -1:
-            best_lemma = self.__lm.best_ngram(token.replace('oe', 'e'), token)
-            if best_lemma is not None:
-                return best_lemma
-        return token
+        return None
@@ -0,0 +1,35 @@
+import asyncio
+
+import scrappybara.config as cfg
+from scrappybara.utils.micro_batcher import MicroBatcher
+
+
+class AsyncPipeline(object):
+    """Processes texts without blocking the event loop.
+    Texts awaited concurrently are coalesced into micro-batches, processed by a dedicated thread.
+    """
+
+    def __init__(self, pipeline, max_batch_size=cfg.MICRO_BATCH_SIZE, max_wait=cfg.MICRO_BATCH_WAIT):
+        """Arg pipeline is a Pipeline, or any callable that returns a list of documents from a list of texts.
+        Arg max_wait is the maximum number of seconds a text waits for others before its batch is processed.
+        """
+        self.__batcher = MicroBatcher(pipeline, max_batch_size, max_wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    async def process(self, text):
+        """Returns the document of a text"""
+        return await asyncio.wrap_future(self.__batcher.submit(text))
+
+    @property
+    def stats(self):
+        """Numbers of batches & texts processed so far"""
+        return self.__batcher.stats
+
+    def close(self):
+        """Processes texts already submitted, then stops the thread. Doesn't close the underlying pipeline"""
+        self.__batcher.close()
@@ -29,6 +29,10 @@ class LabelledSentencePipeline(object):
         self.__fix = Fixer(adjs, nouns)
         self.__canonicalize = Canonicalizer(self.__lemmatize)
 
+    @property
+    def _lemmatizer_cache_stats(self):
+        return self.__lemmatize.cache_stats
+
     def _process_sentence(self, sentence_pack):
         """Args are packed into a list of args so this process can be multithreaded"""
         tokens, tags, idx_tree = sentence_pack
@@ -1,29 +1,36 @@
+import contextlib
 import itertools
 import os
 import sys
 
-from scrappybara.utils.files import load_pkl_file
-
 os.environ["TF_CPP_MIN_LOG_LEVEL"] = "2"
 
-import tensorflow as tf
-
 import scrappybara.config as cfg
 from scrappybara.langmodel.language_model import LanguageModel
 from scrappybara.pipeline.document import Document
 from scrappybara.pipeline.labelled_sentence_pipeline import LabelledSentencePipeline
+from scrappybara.pipeline.result_cache import ResultCache
 from scrappybara.preprocessing.sentencizer import Sentencizer
 from scrappybara.syntax.parser import Parser
 from scrappybara.semantics.entity_linker import EntityLinker, extract_lexeme_bag
-from scrappybara.utils.multithreading import run_multithreads
+from scrappybara.semantics.form_index import FormIndex
+from scrappybara.exceptions import ArgumentValueError
+from scrappybara.utils.executors import make_executor
 from scrappybara.utils.files import txt_file_reader
+from scrappybara.utils.stages import run_stages
 
 
 class Pipeline(LabelledSentencePipeline):
     # Used to split sentences again after they've been sentencized once
     __splitters = {':', '"', ';', '(', ')', '[', ']', '{', '}', '—'}
 
-    def __init__(self, gpu_batch_size=-1):
+    def __init__(self, gpu_batch_size=-1, backends=None, nb_workers=cfg.NB_PROCESSES, cache_path=None,
+                 cache_size=cfg.RESULT_CACHE_SIZE, parser_backend=cfg.PARSER_BACKEND):
+        """Arg backends maps a stage to its backend, overriding config's PIPELINE_BACKENDS.
+        Arg nb_workers is the number of threads/processes of each pool.
+        Arg cache_path is the file of a persistent cache of documents, no cache if None.
+        Arg parser_backend is the runtime of the parser's models, see config's PARSER_BACKENDS.
+        """
         # Check data versioning
         with txt_file_reader(cfg.DATA_DIR / 'version.txt') as txt_file:
             version = txt_file.read()
@@ -31,48 +38,147 @@ class Pipeline(LabelledSentencePipeline):
             sys.exit('Wrong version of data. Please download its newer version: "python3 -m scrappybara download".')
         # GPU ?
         self.__gpu_batch_size = gpu_batch_size
+        self.__parser_backend = parser_backend
         # Load data
-        form_eids = load_pkl_file(cfg.DATA_DIR / 'entities' / 'form_eids.pkl')  # form => list of entity ids
+        form_eids = FormIndex().load()  # form => sorted array of entity ids
         # Language model
         self.__lm = LanguageModel()
         super().__init__(self.__lm, form_eids)
         # Sentencizer
         self.__sentencize = Sentencizer()
         # Parser
-        if gpu_batch_size > 0:
-            self.__parse = Parser(self.__lm, gpu_batch_size)
-        else:
-            with tf.device('/CPU:0'):
-                self.__parse = Parser(self.__lm, 128)
+        with self.__device():
+            self.__parse = Parser(self.__lm, gpu_batch_size if gpu_batch_size > 0 else 128, backend=parser_backend)
         # Entity linker
         self.__link_entities = EntityLinker(form_eids)
+        # Persistent cache of documents
+        self.__result_cache = None
+        if cache_path is not None:
+            # Backends of the parser's models can give slightly different results
+            self.__result_cache = ResultCache(cache_path, cache_size, ['parser_backend=%s' % parser_backend])
+        # Executors: one per backend, shared by stages
+        self.__executors = self.__make_executors(backends or {}, nb_workers)
+        self.__executors['sentencize'].register(self.__split_text)
+        self.__executors['process_sentence'].register(self._process_sentence)
+        self.__stages = [self.__sentencize_batch, self.__parse_batch, self.__process_batch, self.__link_batch]
+        # Workers are forked once all resources are loaded, so they share them with this process
+        for executor in set(self.__executors.values()):
+            executor.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __device(self):
+        """TensorFlow is forced on CPU when no GPU is used. The numpy backend always runs on CPU, without TensorFlow"""
+        if self.__gpu_batch_size > 0 or self.__parser_backend == 'numpy':
+            return contextlib.ExitStack()  # Does nothing
+        import tensorflow as tf
+        return tf.device('/CPU:0')
+
+    @staticmethod
+    def __make_executors(backends, nb_workers):
+        """Returns a dictionary of stage => executor"""
+        for stage in backends:
+            if stage not in cfg.PIPELINE_BACKENDS:
+                raise ArgumentValueError('backends', stage, set(cfg.PIPELINE_BACKENDS))
+        backend_executor = {}
+        stage_executor = {}
+        for stage, backend in dict(cfg.PIPELINE_BACKENDS, **backends).items():
+            if backend not in backend_executor:
+                backend_executor[backend] = make_executor(backend, nb_workers)
+            stage_executor[stage] = backend_executor[backend]
+        return stage_executor
+
+    def close(self):
+        """Stops the workers of the executors & closes the cache"""
+        for executor in set(self.__executors.values()):
+            executor.close()
+        if self.__result_cache is not None:
+            self.__result_cache.close()
 
     def __call__(self, texts):
         """Processes all texts in memory & returns a list of documents"""
-        tokens, sent_ranges = self.__extract_sentences(texts)
-        # Run pipeline on GPU or CPU
-        if self.__gpu_batch_size > 0:
-            _, node_trees, node_dicts = self.__process_tokens(tokens)
-        else:
-            with tf.device('/CPU:0'):
-                _, node_trees, node_dicts = self.__process_tokens(tokens)
-        # Create documents
-        docs = []
-        for idx, start_end in enumerate(sent_ranges):
-            start, end = start_end
-            # Link resources
-            nodes = [node for node_dict in node_dicts[start:end] for node in node_dict.values()]
-            entities = self.__link_entities(nodes, texts[idx])
-            docs.append(Document(entities))
-        return docs
+        return self.__make_documents(texts)
+
+    def iter_documents(self, texts, batch_size=1024):
+        """Processes an iterable of texts by micro-batches & yields documents in input order.
+        Stages run concurrently: a micro-batch is sentencized while the previous one is parsed, etc.
+        At most batch_size * PIPELINE_QUEUE_SIZE texts wait between two stages.
+        """
+        iterator = iter(texts)
+        batches = iter(lambda: list(itertools.islice(iterator, batch_size)), [])
+        for docs in run_stages(batches, self.__stages, cfg.PIPELINE_QUEUE_SIZE):
+            yield from docs
+
+    @property
+    def cache_stats(self):
+        """Hits & misses of the caches of documents, parses, word ids, standardized tokens & lemmas.
+        Stats of documents are None if there's no persistent cache.
+        """
+        words, standards = self.__parse.wordset_cache_stats
+        return {
+            'documents': None if self.__result_cache is None else self.__result_cache.stats,
+            'parses': self.__parse.cache_stats,
+            'words': words,
+            'standards': standards,
+            'lemmas': self._lemmatizer_cache_stats,
+        }
+
+    def __make_documents(self, texts):
+        """Returns a list of documents, processing only texts missing from the cache"""
+        batch = texts
+        for stage in self.__stages:
+            batch = stage(batch)
+        return batch
+
+    # STAGES
+    # Each stage takes & returns a dictionary describing a batch of texts, except the first & last ones
+    # -------------------------------------------------------------------------->
+
+    def __sentencize_batch(self, texts):
+        """Looks up cached documents & sentencizes distinct texts missing from the cache"""
+        docs = [None] * len(texts) if self.__result_cache is None else self.__result_cache.get_many(texts)
+        missing_texts = list(dict.fromkeys([text for text, doc in zip(texts, docs) if doc is None]))
+        tokens, sent_ranges = self.__extract_sentences(missing_texts)
+        return {'texts': texts, 'docs': docs, 'missing_texts': missing_texts, 'tokens': tokens,
+                'sent_ranges': sent_ranges}
+
+    def __parse_batch(self, batch):
+        # Run models on GPU or CPU
+        with self.__device():
+            batch['tags'], batch['trees'] = self.__parse(batch['tokens'])
+        return batch
+
+    def __process_batch(self, batch):
+        sent_packs = list(zip(batch['tokens'], batch['tags'], batch['trees']))
+        batch['node_dicts'] = self.__executors['process_sentence'].map(self._process_sentence, sent_packs)
+        return batch
+
+    def __link_batch(self, batch):
+        """Links resources, creates documents & caches them. Returns a list of documents"""
+        # Nodes are sorted in the order of the text
+        node_dicts = batch['node_dicts']
+        node_lists = [[node for node_dict in node_dicts[start:end] for _, node in sorted(node_dict.items())]
+                      for start, end in batch['sent_ranges']]
+        missing_texts = batch['missing_texts']
+        doc_entities = self.__link_entities.link_batch(node_lists, missing_texts, self.__executors['link'])
+        text_doc = {text: Document(entities) for text, entities in zip(missing_texts, doc_entities)}
+        if self.__result_cache is not None and missing_texts:
+            self.__result_cache.put_many(missing_texts, [text_doc[text] for text in missing_texts])
+        return [text_doc[text] if doc is None else doc for text, doc in zip(batch['texts'], batch['docs'])]
+
+    # PROCESSING
+    # -------------------------------------------------------------------------->
 
     def __extract_sentences(self, texts):
         """Returns a flat list of sentences from all texts.
         Also returns sentences' ranges to be able to regroup by text later.
         """
         # Text tokens is a list of list of list of tokens (tokens grouped by sentences for each text)
-        tokens = run_multithreads(texts, self.__sentencize, cfg.NB_PROCESSES)
-        tokens = run_multithreads(tokens, self.__shorten_sentences, cfg.NB_PROCESSES)
+        tokens = self.__executors['sentencize'].map(self.__split_text, texts)
         # Remember the association text/sentences
         sent_ranges = []
         total_sents = 0
@@ -82,6 +188,10 @@ class Pipeline(LabelledSentencePipeline):
             total_sents = new_total
         return [token_lists for group in tokens for token_lists in group], sent_ranges
 
+    def __split_text(self, text):
+        """Returns a list of lists of tokens, no longer than MAX_SENT_LENGTH"""
+        return self.__shorten_sentences(self.__sentencize(text))
+
     def __shorten_sentences(self, token_lists):
         """Resplit a text's sentences that are too long"""
         new_token_lists = []
@@ -98,7 +208,7 @@ class Pipeline(LabelledSentencePipeline):
         """Proxy for both production __call__ and testing"""
         tags, node_trees = self.__parse(token_lists)
         sent_packs = list(zip(token_lists, tags, node_trees))
-        node_dicts = run_multithreads(sent_packs, self._process_sentence, cfg.NB_PROCESSES)
+        node_dicts = self.__executors['process_sentence'].map(self._process_sentence, sent_packs)
         return tags, node_trees, node_dicts
 
     # INTERNAL USE
@@ -0,0 +1,111 @@
+import hashlib
+import pickle
+import sqlite3
+import itertools
+import threading
+
+import scrappybara.config as cfg
+
+
+def _text_key(text, settings):
+    """Results depend on the text, the code, the data & the settings of the pipeline"""
+    content = '\0'.join([cfg.APP_VERSION, cfg.DATA_VERSION] + list(settings) + [text])
+    return hashlib.sha256(content.encode(cfg.ENCODING)).digest()
+
+
+class ResultCache(object):
+    """Persistent cache of text => document, stored in a SQLite file.
+    Arg max_size is the maximum number of bytes of stored documents:
+    when exceeded, the least recently used documents are evicted.
+    Arg settings is a list of strings describing the settings that can change results (e.g. the parser's backend):
+    documents cached with other settings are never returned.
+    """
+
+    def __init__(self, path, max_size=cfg.RESULT_CACHE_SIZE, settings=()):
+        self.__max_size = max_size
+        self.__settings = [str(setting) for setting in settings]
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(str(path), check_same_thread=False)
+        self.__connection.execute('CREATE TABLE IF NOT EXISTS results '
+                                  '(key BLOB PRIMARY KEY, document BLOB, size INTEGER, last_access INTEGER)')
+        self.__connection.execute('CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access)')
+        self.__connection.commit()
+        self.__size, last_access = self.__connection.execute(
+            'SELECT COALESCE(SUM(size), 0), COALESCE(MAX(last_access), 0) FROM results').fetchone()
+        self.__clock = itertools.count(last_access + 1)  # Logical time of accesses
+        self.__hits = 0
+        self.__misses = 0
+
+    def __len__(self):
+        with self.__lock:
+            return self.__connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    @property
+    def stats(self):
+        with self.__lock:
+            total = self.__hits + self.__misses
+            return {
+                'hits': self.__hits,
+                'misses': self.__misses,
+                'hit_rate': self.__hits / total if total else 0.,
+                'size': self.__size,
+                'max_size': self.__max_size,
+            }
+
+    def get_many(self, texts):
+        """Returns the cached document of each text, None on a miss"""
+        keys = [_text_key(text, self.__settings) for text in texts]
+        key_document = {}
+        with self.__lock:
+            for key in set(keys):
+                row = self.__connection.execute('SELECT document FROM results WHERE key = ?', (key,)).fetchone()
+                if row is not None:
+                    key_document[key] = pickle.loads(row[0])
+            now = next(self.__clock)
+            self.__connection.executemany('UPDATE results SET last_access = ? WHERE key = ?',
+                                          [(now, key) for key in key_document])
+            self.__connection.commit()
+            documents = [key_document.get(key) for key in keys]
+            nb_hits = len([document for document in documents if document is not None])
+            self.__hits += nb_hits
+            self.__misses += len(documents) - nb_hits
+        return documents
+
+    def put_many(self, texts, documents):
+        """Stores the document of each text, then evicts least recently used documents if the cache is too big"""
+        key_blob = {_text_key(text, self.__settings): pickle.dumps(document, pickle.HIGHEST_PROTOCOL)
+                    for text, document in zip(texts, documents)}
+        with self.__lock:
+            now = next(self.__clock)
+            for key, blob in key_blob.items():
+                row = self.__connection.execute('SELECT size FROM results WHERE key = ?', (key,)).fetchone()
+                if row is not None:
+                    self.__size -= row[0]
+                self.__connection.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)',
+                                          (key, blob, len(blob), now))
+                self.__size += len(blob)
+            self.__evict()
+            self.__connection.commit()
+
+    def __evict(self):
+        if self.__size <= self.__max_size:
+            return
+        evicted_keys = []
+        for key, size in self.__connection.execute('SELECT key, size FROM results ORDER BY last_access'):
+            if self.__size <= self.__max_size:
+                break
+            evicted_keys.append((key,))
+            self.__size -= size
+        self.__connection.executemany('DELETE FROM results WHERE key = ?', evicted_keys)
+
+    def clear(self):
+        with self.__lock:
+            self.__connection.execute('DELETE FROM results')
+            self.__connection.commit()
+            self.__size = 0
+            self.__hits = 0
+            self.__misses = 0
+
+    def close(self):
+        with self.__lock:
+            self.__connection.close()
@@ -3,8 +3,15 @@ import re
 from scrappybara.preprocessing.sanitization import sanitize
 
 
+def _triggered(text, triggers):
+    """Whether a rule can match: its pattern can't match a text that contains none of its trigger chars"""
+    return triggers is None or any([char in text for char in triggers])
+
+
 class Tokenizer(object):
-    """Rule based tokenizer, using precompiled regex patterns"""
+    """Rule based tokenizer, using precompiled regex patterns.
+    Each rule lists the chars that trigger it (None: always applied), so rules that can't match are skipped.
+    """
 
     # SANITIZATION
     # -------------------------------------------------------------------------->
@@ -20,26 +27,24 @@ class Tokenizer(object):
 
     # Unambiguous patterns for text that can't be split
     __re_protect = [
-        re.compile(r"\s'n'\s", re.I),  # Abbreviation for "and"
-        re.compile(r"\s('n|n')\s", re.I),  # Abbreviations for "and" (shorter than above)
-        re.compile(r'(https?://|www\.)[^\s.]+(\.[^\s.]+)+(/[^\s]*)*', re.I),  # URLs
-        re.compile(r'[^\s.]+(\.[^\s.]+)+/[^\s]*', re.I),  # URLs (shorter than above)
-        re.compile(r'([:;]-?\))|([:;]-?\()', re.I),  # Common smileys
+        (re.compile(r"\s'n'\s", re.I), "'"),  # Abbreviation for "and"
+        (re.compile(r"\s('n|n')\s", re.I), "'"),  # Abbreviations for "and" (shorter than above)
+        (re.compile(r'(https?://|www\.)[^\s.]+(\.[^\s.]+)+(/[^\s]*)*', re.I), '.'),  # URLs
+        (re.compile(r'[^\s.]+(\.[^\s.]+)+/[^\s]*', re.I), '.'),  # URLs (shorter than above)
+        (re.compile(r'([:;]-?\))|([:;]-?\()', re.I), ':;'),  # Common smileys
     ]
 
     # NON-SPLITABLE CHARS
     # -------------------------------------------------------------------------->
 
     __nsd = '_NSD_'  # for a dot
-    __re_no_split_dot = re.compile(r'%s' % __nsd)
     __nsge = '_NSGE_'  # for '>='
-    __re_no_split_gte = re.compile(r'%s' % __nsge)
     __nsle = '_NSLE_'  # for '<='
-    __re_no_split_lte = re.compile(r'%s' % __nsle)
     __rnsge = '_RNSGE_'  # for '=>'
-    __re_no_split_rgte = re.compile(r'%s' % __rnsge)
     __rnsle = '_RNSLE_'  # for '=<'
-    __re_no_split_rlte = re.compile(r'%s' % __rnsle)
+    # All placeholders are restored in a single pass
+    __no_split_chars = {__nsd: '.', __nsge: ' >= ', __nsle: ' <= ', __rnsge: ' => ', __rnsle: ' =< '}
+    __re_no_split_chars = re.compile('|'.join([__nsd, __nsge, __nsle, __rnsge, __rnsle]))
 
     # Common abbreviations that can be followed by an uppercase letter.
     # These abbreviations must be unambiguous (can't be equal to any common word).
@@ -61,19 +66,19 @@ class Tokenizer(object):
     # Patterns that analyze the surrounding context of a single symbol to protect parts from splitting
     __re_no_split = [
         # Dots
-        (re.compile(r'\.(?=\s[a-z])'), __nsd),  # Dot followed by space and lower case letter
-        (re.compile(r'\.(?=\s?[,:;?!])'), __nsd),  # Dot followed by punctuation
-        (re.compile(r'\.(?=\s\d+\b)'), __nsd),  # Dot followed by a digit
-        (re.compile(r'\b%s(?=\s[A-Z])' % __abbr_options, re.I), r'\g<1>%s' % __nsd),  # Common abbreviation
+        (re.compile(r'\.(?=\s[a-z])'), __nsd, '.'),  # Dot followed by space and lower case letter
+        (re.compile(r'\.(?=\s?[,:;?!])'), __nsd, '.'),  # Dot followed by punctuation
+        (re.compile(r'\.(?=\s\d+\b)'), __nsd, '.'),  # Dot followed by a digit
+        (re.compile(r'\b%s(?=\s[A-Z])' % __abbr_options, re.I), r'\g<1>%s' % __nsd, '.'),  # Common abbreviation
         # Quotes
-        (re.compile(r'(?<=\s)(\d[\d,.]*)\'(\d[\d,.]*)"', re.I), r'\g<1>ft\g<2>in'),  # Inches and feet
-        (re.compile(r'(?<=\s)(\d[\d,.]*)\'', re.I), r'\g<1>ft'),  # Feet
-        (re.compile(r'(?<=\s)(\d[\d,.]*)"', re.I), r'\g<1>in'),  # Inches
+        (re.compile(r'(?<=\s)(\d[\d,.]*)\'(\d[\d,.]*)"', re.I), r'\g<1>ft\g<2>in', "'"),  # Inches and feet
+        (re.compile(r'(?<=\s)(\d[\d,.]*)\'', re.I), r'\g<1>ft', "'"),  # Feet
+        (re.compile(r'(?<=\s)(\d[\d,.]*)"', re.I), r'\g<1>in', '"'),  # Inches
         # < and >
-        (re.compile(r'\s?>\s?=\s?', re.I), __nsge),  # >=
-        (re.compile(r'\s?<\s?=\s?', re.I), __nsle),  # <=
-        (re.compile(r'\s?=\s?>\s?', re.I), __rnsge),  # =>
-        (re.compile(r'\s?=\s?<\s?', re.I), __rnsle),  # =<
+        (re.compile(r'\s?>\s?=\s?', re.I), __nsge, '>'),  # >=
+        (re.compile(r'\s?<\s?=\s?', re.I), __nsle, '<'),  # <=
+        (re.compile(r'\s?=\s?>\s?', re.I), __rnsge, '>'),  # =>
+        (re.compile(r'\s?=\s?<\s?', re.I), __rnsle, '<'),  # =<
     ]
 
     # CHARS TO ALWAYS SEGMENT OFF
@@ -87,15 +92,15 @@ class Tokenizer(object):
     # -------------------------------------------------------------------------->
 
     # Patterns that protect a single token from splitting
-    # Full match
-    __re_token_nosplit_dot = [
-        re.compile(r'(\w\.){2,}', re.I),  # Any series of dotted single chars: "f.f.f."
-        re.compile(r'\.?([^.]+\.){2,}[^.]+', re.I),  # Any series of dotted words: "asdf.asdfadsf.asdf"
-        re.compile(r'[a-zA-Z]\.', re.I),  # Single char followed by a dot: "A. Gray"
-        re.compile(r'\d\.(?=(\s[^A-Z]))', re.I),  # Single digit followed by a dot (the number doesn't need the dot)
-        re.compile(r'(\d+\.){2,}', re.I),  # Series of numbers and dots
-        re.compile(r'\.{2,}', re.I),  # Multiple dots
-    ]
+    # Full match, combined into a single alternation
+    __re_token_nosplit_dot = re.compile('|'.join(['(?:%s)' % pattern for pattern in [
+        r'(\w\.){2,}',  # Any series of dotted single chars: "f.f.f."
+        r'\.?([^.]+\.){2,}[^.]+',  # Any series of dotted words: "asdf.asdfadsf.asdf"
+        r'[a-zA-Z]\.',  # Single char followed by a dot: "A. Gray"
+        r'\d\.(?=(\s[^A-Z]))',  # Single digit followed by a dot (the number doesn't need the dot)
+        r'(\d+\.){2,}',  # Series of numbers and dots
+        r'\.{2,}',  # Multiple dots
+    ]]), re.I)
 
     # Split dots in a token
     # Partial match
@@ -109,53 +114,53 @@ class Tokenizer(object):
 
     __re_segment_off = [
         # Special words to split
-        (re.compile(r'(?<=\b)(can)(not)(?=\b)', re.I), r'\g<1> \g<2>'),
+        (re.compile(r'(?<=\b)(can)(not)(?=\b)', re.I), r'\g<1> \g<2>', None),
         # Star *
-        (re.compile(r'(?<=[a-z])\*+(?=[a-z])', re.I), ' * '),
+        (re.compile(r'(?<=[a-z])\*+(?=[a-z])', re.I), ' * ', '*'),
         # Plus +
-        (re.compile(r'(?<=[a-z][a-z][a-z])\+(?=[a-z]{3,})', re.I), ' + '),
-        (re.compile(r'(\d+)\+(?=[a-z])', re.I), r'\g<1>+ '),
+        (re.compile(r'(?<=[a-z][a-z][a-z])\+(?=[a-z]{3,})', re.I), ' + ', '+'),
+        (re.compile(r'(\d+)\+(?=[a-z])', re.I), r'\g<1>+ ', '+'),
         # Ampercase &
-        (re.compile(r'(?<=\b)&(?!\b)'), ' & '),
-        (re.compile(r'(?<!\b)&(?=\b)'), ' & '),
-        (re.compile(r'([a-zA-Z][a-z]{2,})&([a-zA-Z][a-z]{2,})'), r'\g<1> & \g<2>'),
+        (re.compile(r'(?<=\b)&(?!\b)'), ' & ', '&'),
+        (re.compile(r'(?<!\b)&(?=\b)'), ' & ', '&'),
+        (re.compile(r'([a-zA-Z][a-z]{2,})&([a-zA-Z][a-z]{2,})'), r'\g<1> & \g<2>', '&'),
         # Slash /
-        (re.compile(r'(?<=[a-z\d][a-z])/', re.I), ' / '),
-        (re.compile(r'/(?=[a-z][a-z\d])', re.I), ' / '),
+        (re.compile(r'(?<=[a-z\d][a-z])/', re.I), ' / ', '/'),
+        (re.compile(r'/(?=[a-z][a-z\d])', re.I), ' / ', '/'),
         # Percentage %
-        (re.compile(r'(?<=[a-z])%', re.I), ' % '),
-        (re.compile(r'%(?=[a-z])', re.I), ' % '),
+        (re.compile(r'(?<=[a-z])%', re.I), ' % ', '%'),
+        (re.compile(r'%(?=[a-z])', re.I), ' % ', '%'),
         # Colon :
-        (re.compile(r':(?=\s|$)'), ' : '),
-        (re.compile(r'(?<=\s):'), ' : '),
-        (re.compile(r'([a-zA-Z][a-z]{2,}):([a-zA-Z][a-zA-Z]+)'), r'\g<1> : \g<2>'),
-        (re.compile(r'([a-z]{3,}):(\d+)', re.I), r'\g<1> : \g<2>'),
-        (re.compile(r'([0-9]+):([a-zA-Z]+)', re.I), r'\g<1> : \g<2>'),  # 2:Engage
+        (re.compile(r':(?=\s|$)'), ' : ', ':'),
+        (re.compile(r'(?<=\s):'), ' : ', ':'),
+        (re.compile(r'([a-zA-Z][a-z]{2,}):([a-zA-Z][a-zA-Z]+)'), r'\g<1> : \g<2>', ':'),
+        (re.compile(r'([a-z]{3,}):(\d+)', re.I), r'\g<1> : \g<2>', ':'),
+        (re.compile(r'([0-9]+):([a-zA-Z]+)', re.I), r'\g<1> : \g<2>', ':'),  # 2:Engage
         # Greater than >
-        (re.compile(r'(?<!-)>'), ' > '),
+        (re.compile(r'(?<!-)>'), ' > ', '>'),
         # Less than <
-        (re.compile(r'<(?!-)'), ' < '),
+        (re.compile(r'<(?!-)'), ' < ', '<'),
         # Comma ,
-        (re.compile(r'(?<!\d),'), ' , '),
-        (re.compile(r',(?!\d)'), ' , '),
+        (re.compile(r'(?<!\d),'), ' , ', ','),
+        (re.compile(r',(?!\d)'), ' , ', ','),
         # Single quote '
-        (re.compile(r"(^|\s)'(?!s)"), " ' "),
-        (re.compile(r"'(\s|$)"), " ' "),
-        (re.compile(r"(?<=\w\w\w)'(?=\w\w\w)", re.I), " ' "),
-        (re.compile(r"(^|\s)'(?=s\w)", re.I), " ' "),
-        (re.compile(r"(n't|'re|'ll|'ve|'m|'d|'s)(?=\s|$)", re.I), r' \g<1> '),
+        (re.compile(r"(^|\s)'(?!s)"), " ' ", "'"),
+        (re.compile(r"'(\s|$)"), " ' ", "'"),
+        (re.compile(r"(?<=\w\w\w)'(?=\w\w\w)", re.I), " ' ", "'"),
+        (re.compile(r"(^|\s)'(?=s\w)", re.I), " ' ", "'"),
+        (re.compile(r"(n't|'re|'ll|'ve|'m|'d|'s)(?=\s|$)", re.I), r' \g<1> ', "'"),
         # Bullets (often * or -)
-        (re.compile(r'\s([*-])([a-zA-Z]+)(?=\s|$)'), r' \g<1> \g<2> '),
+        (re.compile(r'\s([*-])([a-zA-Z]+)(?=\s|$)'), r' \g<1> \g<2> ', '*-'),
     ]
 
     # TEXT TO REATTACH
     # -------------------------------------------------------------------------->
 
     __re_reattach = [
-        (re.compile(r'\b([A-Z])\s([A-Z])\s&\s([A-Z])\b'), r'\g<1>\g<2>&\g<3>'),
-        (re.compile(r'\b([A-Z])\s&\s([A-Z])\s([A-Z])\b'), r'\g<1>&\g<2>\g<3>'),
-        (re.compile(r'\b([A-Z])\s&\s([A-Z])\b'), r'\g<1>&\g<2>'),
-        (re.compile(r'(\.{2,}) \.'), r'\g<1>.'),
+        (re.compile(r'\b([A-Z])\s([A-Z])\s&\s([A-Z])\b'), r'\g<1>\g<2>&\g<3>', '&'),
+        (re.compile(r'\b([A-Z])\s&\s([A-Z])\s([A-Z])\b'), r'\g<1>&\g<2>\g<3>', '&'),
+        (re.compile(r'\b([A-Z])\s&\s([A-Z])\b'), r'\g<1>&\g<2>', '&'),
+        (re.compile(r'(\.{2,}) \.'), r'\g<1>.', '.'),
     ]
 
     def __call__(self, text):
@@ -166,33 +171,33 @@ class Tokenizer(object):
         # Protect tokens
         protected, text = self.__protect_text(text)
         # Protect single symbols
-        for nsp in self.__re_no_split:
-            text = re.sub(nsp[0], nsp[1], text)
+        for pattern, replace, triggers in self.__re_no_split:
+            if _triggered(text, triggers):
+                text = pattern.sub(replace, text)
         # Segment off unambiguous patterns
-        text = re.sub(self.__re_always_split, r' \g<0> ', text)
-        # Segment off ending dots
+        text = self.__re_always_split.sub(r' \g<0> ', text)
+        # Segment off ending dots (tokens without any dot are left untouched)
         tokens = []
         for token in text.split():
-            if any([re.fullmatch(regex, token) for regex in self.__re_token_nosplit_dot]):
+            if '.' not in token or self.__re_token_nosplit_dot.fullmatch(token):
                 tokens.append(token)
             else:
                 for pattern, rep in self.__re_token_split_dot:
-                    token = re.sub(pattern, rep, token)
+                    token = pattern.sub(rep, token)
                 tokens.extend(token.split())
         text = ' '.join(tokens)
         # Segment off other symbols
-        for pattern, replace in self.__re_segment_off:
-            text = re.sub(pattern, replace, text)
+        for pattern, replace, triggers in self.__re_segment_off:
+            if _triggered(text, triggers):
+                text = pattern.sub(replace, text)
         text = ' '.join(text.split())
         # Re-establish symbols
-        text = re.sub(self.__re_no_split_dot, '.', text)
-        text = re.sub(self.__re_no_split_gte, ' >= ', text)
-        text = re.sub(self.__re_no_split_lte, ' <= ', text)
-        text = re.sub(self.__re_no_split_rgte, ' => ', text)
-        text = re.sub(self.__re_no_split_rlte, ' =< ', text)
+        if '_' in text:
+            text = self.__re_no_split_chars.sub(lambda match: self.__no_split_chars[match.group()], text)
         # Re-attach text
-        for replace in self.__re_reattach:
-            text = re.sub(replace[0], replace[1], text)
+        for pattern, replace, triggers in self.__re_reattach:
+            if _triggered(text, triggers):
+                text = pattern.sub(replace, text)
         # Re-establish protected patterns
         for key, value in protected.items():
             text = text.replace(key, value)
@@ -202,7 +207,9 @@ class Tokenizer(object):
         """Detects patterns that should not be tokenized"""
         protected = {}
         index = 1
-        for pattern in self.__re_protect:
+        for pattern, triggers in self.__re_protect:
+            if not _triggered(text, triggers):
+                continue
             match = re.search(pattern, text)
             while match:
                 token = match.group()
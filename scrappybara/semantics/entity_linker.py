@@ -1,12 +1,14 @@
 import collections
 import re
+
 import numpy as np
 
 import scrappybara.config as cfg
+from scrappybara.semantics.entity_vectors import EntityVectors
 from scrappybara.semantics.resources import Entity
 from scrappybara.syntax.tags import Tag
+from scrappybara.utils.executors import InlineExecutor
 from scrappybara.utils.files import load_pkl_file
-from scrappybara.utils.maths import cosine
 
 
 def extract_lexeme_bag(nodes):
@@ -14,50 +16,77 @@ def extract_lexeme_bag(nodes):
     return collections.Counter([n.canon for n in nodes if n.is_lexeme])
 
 
-def _find_boundaries(form, text):
-    return iter([match.span() for match in re.finditer(form, text)])
+def _find_text_boundaries(text_forms):
+    """Returns boundaries of the next occurrence of each form in the text, (None, None) if there's none left"""
+    text, forms = text_forms
+    if not forms:
+        return []
+    form_boundaries = {form: iter([match.span() for match in re.finditer(re.escape(form), text)])
+                       for form in set(forms)}
+    return [next(form_boundaries[form], (None, None)) for form in forms]
 
 
 class EntityLinker(object):
 
     def __init__(self, form_eids):
-        self.__form_eids = form_eids  # form => set of entity IDs
-        self.__eid_vector = load_pkl_file(cfg.DATA_DIR / 'entities' / 'eid_vector.pkl')  # eID => dict sparce vector
+        self.__form_eids = form_eids  # form => sorted array of entity IDs
+        self.__eid_vectors = EntityVectors().load()  # eID => sparse vector
         self.__lexeme_idx_idf = load_pkl_file(cfg.DATA_DIR / 'entities' / 'lexemes.pkl')  # lexeme => (idx, idf score)
+        self.__inline_executor = InlineExecutor()
 
     def __call__(self, nodes, original_text):
         """Links proper nouns to entity IDs.
         Creates Entity object and attaches it to the Node in place.
         Returns a consolidated list of tuple (propn, entity)"""
-        to_disambiguate = []
-        nodes_eids = []  # list of tuples (node, entity_id)
-        for node in [n for n in nodes if n.tag == Tag.PROPN]:
-            try:
-                eids = self.__form_eids[node.canon]  # Set of entity IDs
+        return self.link_batch([nodes], [original_text])[0]
+
+    def link_batch(self, node_lists, texts, executor=None):
+        """Links proper nouns of many documents at once, a document being a list of nodes & its original text.
+        Nodes must be in the order of the text: boundaries are assigned to them in this order.
+        Candidates of all ambiguous mentions are scored in one sparse product.
+        Boundaries are found by the executor, inline by default.
+        Returns a list of entities per document"""
+        doc_nodes_eids = [[] for _ in node_lists]  # per document, list of tuples (node, entity_id)
+        to_disambiguate = []  # list of tuples (doc idx, node, entity IDs)
+        node_positions = {}  # node id => position in its document
+        for doc_idx, nodes in enumerate(node_lists):
+            for position, node in enumerate(nodes):
+                node_positions[id(node)] = position
+            for node in [n for n in nodes if n.tag == Tag.PROPN]:
+                eids = self.__form_eids.get(node.canon)  # Array of entity IDs
+                if eids is None:
+                    continue
                 if len(eids) > 1:
                     # Ambiguity
-                    to_disambiguate.append((node, eids))
+                    to_disambiguate.append((doc_idx, node, eids))
                 elif len(eids) == 1:
                     # No ambiguity
-                    nodes_eids.append((node, next(iter(eids))))
-            except (KeyError, IndexError):
-                continue
-        # Disambiguate
+                    doc_nodes_eids[doc_idx].append((node, int(eids[0])))
+        # Disambiguate: each document with ambiguities is vectorized
         if len(to_disambiguate):
-            vector = self.__vectorize(nodes)
-            for node, eids in to_disambiguate:
-                scores = [cosine(vector, self.__eid_vector[entity_id]) for entity_id in eids]
-                nodes_eids.append((node, eids[np.argmax(scores)]))
+            doc_vector_ids = {}
+            vectors = []
+            for doc_idx in sorted({doc_idx for doc_idx, _, _ in to_disambiguate}):
+                doc_vector_ids[doc_idx] = len(vectors)
+                vectors.append(self.__vectorize(node_lists[doc_idx]))
+            scores = self.__eid_vectors.batch_cosines(
+                np.concatenate([eids for _, _, eids in to_disambiguate]),
+                np.repeat([doc_vector_ids[doc_idx] for doc_idx, _, _ in to_disambiguate],
+                          [len(eids) for _, _, eids in to_disambiguate]),
+                vectors)
+            offset = 0
+            for doc_idx, node, eids in to_disambiguate:
+                doc_nodes_eids[doc_idx].append((node, int(eids[np.argmax(scores[offset:offset + len(eids)])])))
+                offset += len(eids)
         # Find boundaries
-        unique_forms = {node.text for node, _ in nodes_eids}
-        form_boundaries = {form: _find_boundaries(form, original_text) for form in unique_forms}
-        for node, entity_id in sorted(nodes_eids, key=lambda x: x[0].idx):
-            try:
-                boundaries = next(form_boundaries[node.text])
-            except StopIteration:
-                boundaries = (None, None)
-            node.resource = Entity(entity_id, node.text, *boundaries)
-        return [node.resource for node in nodes if type(node.resource) == Entity]
+        doc_nodes_eids = [sorted(nodes_eids, key=lambda x: node_positions[id(x[0])]) for nodes_eids in doc_nodes_eids]
+        doc_boundaries = (executor or self.__inline_executor).map(
+            _find_text_boundaries,
+            [(text, [node.text for node, _ in nodes_eids]) for text, nodes_eids in zip(texts, doc_nodes_eids)])
+        for nodes_eids, boundaries in zip(doc_nodes_eids, doc_boundaries):
+            for (node, entity_id), (start_idx, end_idx) in zip(nodes_eids, boundaries):
+                node.resource = Entity(entity_id, node.text, start_idx, end_idx)
+        return [[node.resource for node in nodes if type(node.resource) == Entity] for nodes in node_lists]
 
     def __vectorize(self, nodes):
         """Returns sparse vector of a text"""
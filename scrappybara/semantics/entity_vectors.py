@@ -0,0 +1,103 @@
+import pathlib
+
+import numpy as np
+
+import scrappybara.config as cfg
+from scrappybara.utils.files import load_pkl_file, path_exists, save_npy_file
+
+
+class EntityVectors(object):
+    """Sparse vectors of entities, stored as a memory-mapped CSR matrix with precomputed norms:
+      * eids: entity ID of each row, sorted
+      * indptr, indices & data: rows in CSR layout
+      * norms: L2 norm of each row
+    """
+
+    __names = ['eids', 'indptr', 'indices', 'data', 'norms']
+
+    def __init__(self, dirpath=None):
+        """Arg dirpath defaults to the entities' directory of DATA_DIR"""
+        self.__dirpath = cfg.DATA_DIR / 'entities' if dirpath is None else pathlib.Path(dirpath)
+        self.__arrays = {}  # name => numpy array
+
+    def __len__(self):
+        return len(self.__arrays['eids'])
+
+    def __filepath(self, name):
+        return self.__dirpath / ('eid_vector_%s.npy' % name)
+
+    def __rows(self, eids):
+        """Returns row of each entity ID, -1 if it has no vector"""
+        row_eids = self.__arrays['eids']
+        if not len(row_eids):
+            return np.full(len(eids), -1)
+        rows = np.minimum(np.searchsorted(row_eids, eids), len(row_eids) - 1)
+        return np.where(row_eids[rows] == eids, rows, -1)
+
+    def load(self):
+        # The downloaded dictionary of eID => dict sparse vector is converted once.
+        # Files are written atomically, so concurrent processes never map a partial file.
+        if not all([path_exists(self.__filepath(name)) for name in self.__names]):
+            self.save(load_pkl_file(self.__dirpath / 'eid_vector.pkl'))
+        self.__arrays = {name: np.load(self.__filepath(name), mmap_mode='r') for name in self.__names}
+        return self
+
+    def save(self, eid_vector):
+        """Arg eid_vector is a dictionary of eID => sparse vector (dictionary of idx => non_zero_value)"""
+        eids = sorted(eid_vector)
+        vectors = [sorted(eid_vector[eid].items()) for eid in eids]
+        lengths = [len(vector) for vector in vectors]
+        data = np.array([value for vector in vectors for _, value in vector], dtype=np.float32)
+        squares = np.bincount(np.repeat(np.arange(len(eids)), lengths), weights=data.astype(np.float64) ** 2,
+                              minlength=len(eids))
+        arrays = {
+            'eids': np.array(eids, dtype=np.int32),
+            'indptr': np.cumsum([0] + lengths, dtype=np.int64),
+            'indices': np.array([idx for vector in vectors for idx, _ in vector], dtype=np.int32),
+            'data': data,
+            'norms': np.sqrt(squares).astype(np.float32),
+        }
+        for name, array in arrays.items():
+            save_npy_file(array, self.__filepath(name))
+
+    def cosines(self, eids, vector):
+        """Cosine similarity between a sparse vector (dictionary of idx => non_zero_value) & the vector of each entity.
+        Returns -1 for entities without vector or when the vector is null, same as utils.maths.cosine.
+        """
+        return self.batch_cosines(eids, np.zeros(len(eids), dtype=np.int64), [vector])
+
+    def batch_cosines(self, eids, vector_ids, vectors):
+        """Cosine similarity between each entity eids[i] & the sparse vector vectors[vector_ids[i]].
+        All rows are scored in one sparse matrix-vector product.
+        """
+        eids = np.asarray(eids, dtype=np.int32)
+        vector_ids = np.asarray(vector_ids, dtype=np.int64)
+        scores = np.full(len(eids), -1.0)
+        # Vectors are flattened & keyed by (vector ID, idx), sorted
+        keys = np.array([(vector_id << 32) | idx for vector_id, vector in enumerate(vectors) for idx in vector],
+                        dtype=np.int64)
+        values = np.array([value for vector in vectors for value in vector.values()], dtype=np.float64)
+        vector_norms = np.sqrt([sum([value ** 2 for value in vector.values()]) for vector in vectors])
+        order = np.argsort(keys)
+        keys = keys[order]
+        values = values[order]
+        rows = self.__rows(eids)
+        found = (rows >= 0) & (vector_norms[vector_ids] > 0)
+        if not found.any():
+            return scores
+        rows = rows[found]
+        vector_ids = vector_ids[found]
+        # Gathers all non-zero values of the selected rows
+        indptr = self.__arrays['indptr']
+        starts = indptr[rows]
+        lengths = indptr[rows + 1] - starts
+        row_ids = np.repeat(np.arange(len(rows)), lengths)
+        positions = np.arange(lengths.sum()) + np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        row_keys = (vector_ids[row_ids] << 32) | self.__arrays['indices'][positions]
+        # Matches them against the vectors' non-zero values
+        matches = np.minimum(np.searchsorted(keys, row_keys), len(keys) - 1)
+        products = np.where(keys[matches] == row_keys, self.__arrays['data'][positions] * values[matches], 0.0)
+        dots = np.bincount(row_ids, weights=products, minlength=len(rows))
+        denominators = self.__arrays['norms'][rows] * vector_norms[vector_ids]
+        scores[found] = np.where(denominators > 0, dots / np.where(denominators > 0, denominators, 1), -1)
+        return scores
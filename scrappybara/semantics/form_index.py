@@ -0,0 +1,88 @@
+import collections.abc
+import hashlib
+import pathlib
+
+import numpy as np
+
+import scrappybara.config as cfg
+from scrappybara.utils.files import load_pkl_file, path_exists, save_npy_file
+
+
+def _hash_form(form):
+    """Stable 64-bit hash of a form (python's hash is randomized per process)"""
+    return int.from_bytes(hashlib.blake2b(form.encode(cfg.ENCODING), digest_size=8).digest(), 'little')
+
+
+class FormIndex(collections.abc.Mapping):
+    """Read-only mapping of form => sorted array of entity IDs.
+    Arrays are memory-mapped, so loading is immediate & processes share their pages:
+      * hashes: forms' hashes, sorted
+      * chars & char_offsets: forms as utf-8 bytes, concatenated in the order of their hashes
+      * eids & eid_offsets: entity IDs of each form, concatenated (CSR layout)
+    """
+
+    __names = ['hashes', 'chars', 'char_offsets', 'eids', 'eid_offsets']
+
+    def __init__(self, dirpath=None):
+        """Arg dirpath defaults to the entities' directory of DATA_DIR"""
+        self.__dirpath = cfg.DATA_DIR / 'entities' if dirpath is None else pathlib.Path(dirpath)
+        self.__arrays = {}  # name => numpy array
+
+    def __len__(self):
+        return len(self.__arrays['hashes'])
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self.__form(idx)
+
+    def __contains__(self, form):
+        return self.__find(form) is not None
+
+    def __getitem__(self, form):
+        idx = self.__find(form)
+        if idx is None:
+            raise KeyError(form)
+        eid_offsets = self.__arrays['eid_offsets']
+        return self.__arrays['eids'][eid_offsets[idx]:eid_offsets[idx + 1]]
+
+    def __filepath(self, name):
+        return self.__dirpath / ('form_%s.npy' % name)
+
+    def __form(self, idx):
+        char_offsets = self.__arrays['char_offsets']
+        return self.__arrays['chars'][char_offsets[idx]:char_offsets[idx + 1]].tobytes().decode(cfg.ENCODING)
+
+    def __find(self, form):
+        """Returns the index of a form, None if not found"""
+        hashes = self.__arrays['hashes']
+        form_hash = _hash_form(form)
+        idx = int(np.searchsorted(hashes, form_hash))
+        # Forms sharing the same hash are contiguous
+        while idx < len(hashes) and hashes[idx] == form_hash:
+            if self.__form(idx) == form:
+                return idx
+            idx += 1
+        return None
+
+    def load(self):
+        # The downloaded dictionary of form=>set of entity IDs is converted once.
+        # Files are written atomically, so concurrent processes never map a partial file.
+        if not all([path_exists(self.__filepath(name)) for name in self.__names]):
+            self.save(load_pkl_file(self.__dirpath / 'form_eids.pkl'))
+        self.__arrays = {name: np.load(self.__filepath(name), mmap_mode='r') for name in self.__names}
+        return self
+
+    def save(self, form_eids):
+        """Arg form_eids is a dictionary of form => set of entity IDs"""
+        hash_forms = sorted([(_hash_form(form), form) for form in form_eids])
+        encoded_forms = [form.encode(cfg.ENCODING) for _, form in hash_forms]
+        eid_lists = [sorted(form_eids[form]) for _, form in hash_forms]
+        arrays = {
+            'hashes': np.array([form_hash for form_hash, _ in hash_forms], dtype=np.uint64),
+            'chars': np.frombuffer(b''.join(encoded_forms), dtype=np.uint8),
+            'char_offsets': np.cumsum([0] + [len(form) for form in encoded_forms], dtype=np.int64),
+            'eids': np.array([eid for eids in eid_lists for eid in eids], dtype=np.int32),
+            'eid_offsets': np.cumsum([0] + [len(eids) for eids in eid_lists], dtype=np.int64),
+        }
+        for name, array in arrays.items():
+            save_npy_file(array, self.__filepath(name))
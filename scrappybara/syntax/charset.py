@@ -1,3 +1,5 @@
+import numpy as np
+
 import scrappybara.config as cfg
 from scrappybara.utils.files import load_pkl_file, save_pkl_file
 from scrappybara.utils.text import LETTERS, UPPERCASE_LETTERS, DIGITS
@@ -9,6 +11,7 @@ class Charset(object):
         self.__filepath = cfg.DATA_DIR / 'models/char_codes.pkl'
         self.__char_code = None  # Char => code
         self.__unk_code = None  # Positive integer
+        self.__code_table = None  # Unicode code point => code
 
     def __len__(self):
         return len(self.__char_code) + 1
@@ -23,8 +26,19 @@ class Charset(object):
     def load(self):
         self.__char_code = load_pkl_file(self.__filepath)
         self.__unk_code = max(self.__char_code.values()) + 1
+        self.__code_table = np.full(max([ord(char) for char in self.__char_code]) + 1, self.__unk_code, dtype=np.int32)
+        for char, code in self.__char_code.items():
+            self.__code_table[ord(char)] = code
         return self
 
+    def encode(self, text):
+        """Returns the codes of all chars of a text as a numpy array"""
+        points = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+        codes = np.full(len(points), self.__unk_code, dtype=np.int32)
+        known = points < len(self.__code_table)
+        codes[known] = self.__code_table[points[known]]
+        return codes
+
     def save(self):
         """Save dictionary of char=>idx as a pkl file"""
         special_chars = set('`~!@#$£€%^&*()-_=+[{]}\\|;:\'",<.>/?')
@@ -27,7 +27,7 @@ def _chunk(root, noun_parts, form_eids):
 class Chunker(object):
 
     def __init__(self, form_eids):
-        self.__form_eids = form_eids  # form => list of entity ids
+        self.__form_eids = form_eids  # form => sorted array of entity ids
 
     def __call__(self, node_dict, node_tree):
         """Detects parts of noun-phrases via CPL"""
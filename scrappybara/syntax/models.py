@@ -5,6 +5,24 @@ import scrappybara.config as cfg
 from scrappybara.syntax.dependencies import NB_DEPS
 from scrappybara.syntax.tags import NB_TAGS
 from scrappybara.syntax.transitions import Trans
+from scrappybara.utils.files import atomic_dirpath
+
+# Model => directory of its SavedModel in the models' directory
+SAVED_MODEL_DIRS = {
+    'ptags': 'ptags_saved_model',
+    'pdeps': 'pdeps_saved_model',
+    'trans': 'trans_saved_model',
+}
+
+
+def _inference_function(model, input_specs):
+    """Graph of the model in inference mode, for a fixed signature"""
+
+    @tf.function(input_signature=input_specs)
+    def _infer(*inputs):
+        return model(list(inputs) if len(inputs) > 1 else inputs[0], training=False)
+
+    return _infer
 
 
 class _SentenceModel(object):
@@ -26,8 +44,9 @@ class _SentenceModel(object):
     def _char_model(self, charset_size):
         """We use a CNN for syllables of 2, 3, 4 & 5 characters to extract morphological features of a word.
         Words are minimum 3 characters-long because of the padding.
+        Sentences are padded to PADDED_SENT_LENGTH, as in training: padding timesteps aren't masked.
         """
-        char_inputs = tf.keras.layers.Input(shape=(cfg.PADDED_SENT_LENGTH, cfg.PADDED_WORD_LENGTH),
+        char_inputs = tf.keras.layers.Input(shape=(None, cfg.PADDED_WORD_LENGTH),
                                             dtype=tf.int32)
         char_embed = tf.keras.layers.Embedding(charset_size, self.__char_vector_size, mask_zero=True)(char_inputs)
         windows = [2, 3, 4, 5]
@@ -37,7 +56,7 @@ class _SentenceModel(object):
                 char_embed)
             pools.append(tf.keras.layers.MaxPool2D(pool_size=(1, cfg.PADDED_WORD_LENGTH))(conv))
         concat_cnns = tf.keras.layers.concatenate(pools, axis=2)
-        cnn = tf.keras.layers.Reshape((cfg.PADDED_SENT_LENGTH, self.__convolution_filters * len(windows)))(
+        cnn = tf.keras.layers.Reshape((-1, self.__convolution_filters * len(windows)))(
             concat_cnns)
         return tf.keras.Model(inputs=char_inputs, outputs=cnn)
 
@@ -58,6 +77,28 @@ class _SentenceModel(object):
     def _load(self, filename):
         self._model.load_weights(cfg.DATA_DIR / 'models' / filename)
 
+    @staticmethod
+    def _export(dirname, functions):
+        """Saves inference functions as a SavedModel, loadable without building the Keras graphs.
+        Arg functions maps a function's name to a tuple (Keras model, input specs).
+        The directory is renamed once complete, so concurrent processes never load a partial export.
+        """
+        module = tf.Module()
+        for name, (model, input_specs) in functions.items():
+            setattr(module, name + '_model', model)
+            setattr(module, name, _inference_function(model, input_specs))
+        with atomic_dirpath(cfg.DATA_DIR / 'models' / dirname) as tmp_path:
+            tf.saved_model.save(module, tmp_path)
+
+    @staticmethod
+    def _char_specs():
+        return [tf.TensorSpec((None, None, cfg.PADDED_WORD_LENGTH), tf.int32),
+                tf.TensorSpec((None, None, cfg.WORD_VECTOR_SIZE), tf.float32)]
+
+    @staticmethod
+    def _code_spec():
+        return tf.TensorSpec((None, None), tf.int32)
+
 
 class PTagsModel(_SentenceModel):
     """Predicts part-of-speech tags for every token in a sentence"""
@@ -70,7 +111,7 @@ class PTagsModel(_SentenceModel):
         # Char model
         char_model = self._char_model(charset_size)
         # Word model
-        word_inputs = tf.keras.layers.Input(shape=(cfg.PADDED_SENT_LENGTH, cfg.WORD_VECTOR_SIZE),
+        word_inputs = tf.keras.layers.Input(shape=(None, cfg.WORD_VECTOR_SIZE),
                                             dtype=tf.float32)
         word_repr = tf.keras.layers.concatenate([char_model.output, word_inputs], axis=2)
         word_model = tf.keras.Model(inputs=[char_model.input, word_inputs], outputs=word_repr)
@@ -92,9 +133,16 @@ class PTagsModel(_SentenceModel):
         self._load(self.__filename)
         return self
 
+    def export(self):
+        self._export(SAVED_MODEL_DIRS['ptags'], {'predict': (self._model, self._char_specs())})
+
+    def scores(self, char_codes, word_vectors):
+        """Probabilities of tags, callable in a TensorFlow graph"""
+        return self._model([char_codes, word_vectors], training=False)
+
     def predict(self, char_codes, word_vectors):
         seqs = self._model.predict([np.array(char_codes), np.array(word_vectors)])
-        return [[np.argmax(probas) for probas in seq] for seq in seqs]
+        return np.argmax(seqs, axis=-1).astype(np.int8)
 
 
 class PDepsModel(_SentenceModel):
@@ -108,8 +156,8 @@ class PDepsModel(_SentenceModel):
         # Char model
         char_model = self._char_model(charset_size)
         # Word model
-        tag_inputs = tf.keras.layers.Input(shape=(cfg.PADDED_SENT_LENGTH,), dtype=tf.int32)
-        word_inputs = tf.keras.layers.Input(shape=(cfg.PADDED_SENT_LENGTH, cfg.WORD_VECTOR_SIZE),
+        tag_inputs = tf.keras.layers.Input(shape=(None,), dtype=tf.int32)
+        word_inputs = tf.keras.layers.Input(shape=(None, cfg.WORD_VECTOR_SIZE),
                                             dtype=tf.float32)
         tag_embed = tf.keras.layers.Embedding(self._nb_tags, self._tag_vector_size)(tag_inputs)
         word_repr = tf.keras.layers.concatenate([char_model.output, word_inputs, tag_embed], axis=2)
@@ -134,13 +182,24 @@ class PDepsModel(_SentenceModel):
         self._load(self.__filename)
         return self
 
+    def export(self):
+        self._export(SAVED_MODEL_DIRS['pdeps'], {'predict': (self._model, [self._code_spec()] + self._char_specs())})
+
+    def scores(self, tag_codes, char_codes, word_vectors):
+        """Probabilities of dependencies, callable in a TensorFlow graph"""
+        return self._model([tag_codes, char_codes, word_vectors], training=False)
+
     def predict(self, tag_codes, char_codes, word_vectors):
         seqs = self._model.predict([np.array(tag_codes), np.array(char_codes), np.array(word_vectors)])
-        return [[np.argmax(probas) for probas in seq] for seq in seqs]
+        return np.argmax(seqs, axis=-1).astype(np.int8)
 
 
 class TransModel(_SentenceModel):
-    """Predicts parsing transition"""
+    """Predicts parsing transition.
+    The model is split in 2 parts sharing the same weights:
+      * an encoder: BiLSTM over the whole sentence, run once per sentence
+      * a head: MLP over the encodings of the stack's top & the buffer's head, run at every transition
+    """
 
     def __init__(self, charset_size):
         super().__init__()
@@ -153,12 +212,12 @@ class TransModel(_SentenceModel):
         # Char model
         char_model = self._char_model(charset_size)
         # Word model
-        tag_inputs = tf.keras.layers.Input(shape=(cfg.PADDED_SENT_LENGTH,), dtype=tf.int32)
-        dep_inputs = tf.keras.layers.Input(shape=(cfg.PADDED_SENT_LENGTH,), dtype=tf.int32)
-        word_inputs = tf.keras.layers.Input(shape=(cfg.PADDED_SENT_LENGTH, cfg.WORD_VECTOR_SIZE),
+        tag_inputs = tf.keras.layers.Input(shape=(None,), dtype=tf.int32)
+        dep_inputs = tf.keras.layers.Input(shape=(None,), dtype=tf.int32)
+        word_inputs = tf.keras.layers.Input(shape=(None, cfg.WORD_VECTOR_SIZE),
                                             dtype=tf.float32)
-        masks_1_inputs = tf.keras.layers.Input(shape=(cfg.PADDED_SENT_LENGTH,), dtype=tf.bool)
-        masks_2_inputs = tf.keras.layers.Input(shape=(cfg.PADDED_SENT_LENGTH,), dtype=tf.bool)
+        masks_1_inputs = tf.keras.layers.Input(shape=(None,), dtype=tf.bool)
+        masks_2_inputs = tf.keras.layers.Input(shape=(None,), dtype=tf.bool)
         tag_embed = tf.keras.layers.Embedding(self._nb_tags, self._tag_vector_size)(tag_inputs)
         dep_embed = tf.keras.layers.Embedding(self._nb_deps, self._dep_vector_size)(dep_inputs)
         word_repr = tf.keras.layers.concatenate([char_model.output, word_inputs, tag_embed, dep_embed], axis=2)
@@ -172,12 +231,18 @@ class TransModel(_SentenceModel):
         timestep2 = tf.boolean_mask(bilstm, masks_2_inputs, axis=0)
         mlp_inputs = tf.keras.layers.concatenate([timestep1, timestep2], axis=1)
         bilstm_model = tf.keras.Model(inputs=word_model.inputs + [masks_1_inputs, masks_2_inputs], outputs=mlp_inputs)
+        # MLP layers (shared by the training model & the inference head)
+        dense_layer = tf.keras.layers.Dense(mlp_units, input_shape=(lstm_units * 4,), activation='relu')
+        dropout_layer = tf.keras.layers.Dropout(mlp_dropout)
+        probas_layer = tf.keras.layers.Dense(trans_size, activation='softmax')
         # Model
-        dense = tf.keras.layers.Dense(mlp_units, input_shape=(lstm_units * 4,), activation='relu')(bilstm_model.output)
-        dropout = tf.keras.layers.Dropout(mlp_dropout)(dense)
-        probas = tf.keras.layers.Dense(trans_size, activation='softmax')(dropout)
+        probas = probas_layer(dropout_layer(dense_layer(bilstm_model.output)))
         self._model = tf.keras.Model(inputs=bilstm_model.inputs, outputs=probas)
         self._model.compile(optimizer='adam', loss='sparse_categorical_crossentropy', metrics=['accuracy'])
+        # Inference: encoder & head
+        self.__encoder = tf.keras.Model(inputs=word_model.inputs, outputs=bilstm)
+        head_inputs = tf.keras.layers.Input(shape=(lstm_units * 4,), dtype=tf.float32)
+        self.__head = tf.keras.Model(inputs=head_inputs, outputs=probas_layer(dropout_layer(dense_layer(head_inputs))))
 
     def learn(self, batch_size, patience, epochs, train_y, validation_split, train_tag_ids, train_dep_ids,
               train_char_ids, train_word_vectors, train_masks_1, train_masks_2):
@@ -191,8 +256,44 @@ class TransModel(_SentenceModel):
         self._load(self.__filename)
         return self
 
-    def predict(self, tag_codes, dep_codes, char_codes, word_vectors, masks_1, masks_2):
-        batch_probas = self._model.predict(
-            [np.array(tag_codes), np.array(dep_codes), np.array(char_codes), np.array(word_vectors), np.array(masks_1),
-             np.array(masks_2)])
-        return [np.argmax(probas) for probas in batch_probas]
+    def export(self):
+        self._export(SAVED_MODEL_DIRS['trans'], {
+            'encode': (self.__encoder, [self._code_spec(), self._code_spec()] + self._char_specs()),
+            'predict': (self.__head, [tf.TensorSpec((None, self.__head.input_shape[-1]), tf.float32)]),
+        })
+
+    def encodings(self, tag_codes, dep_codes, char_codes, word_vectors):
+        """BiLSTM encodings, callable in a TensorFlow graph"""
+        return self.__encoder([tag_codes, dep_codes, char_codes, word_vectors], training=False)
+
+    def encode(self, tag_codes, dep_codes, char_codes, word_vectors):
+        """Returns the BiLSTM encodings of every timestep of every sentence"""
+        return self.__encoder.predict([np.array(tag_codes), np.array(dep_codes), np.array(char_codes),
+                                       np.array(word_vectors)])
+
+    def predict(self, encodings_1, encodings_2):
+        """Args are the encodings of the stack's top & of the buffer's head"""
+        batch_probas = self.__head.predict_on_batch(np.concatenate([encodings_1, encodings_2], axis=1))
+        return np.argmax(batch_probas, axis=-1).astype(np.int8)
+
+
+class FusedModel(object):
+    """Predicts tags, then dependencies, then encodes sentences for transitions, in a single TensorFlow graph.
+    Predicted codes feed the next model without leaving the graph.
+    Models only need to be callable in a graph, so they can be Keras models or loaded SavedModels.
+    """
+
+    def __init__(self, ptags_model, pdeps_model, trans_model):
+        @tf.function(input_signature=_SentenceModel._char_specs(), autograph=False)
+        def _run(char_codes, word_vectors):
+            tag_codes = tf.argmax(ptags_model.scores(char_codes, word_vectors), axis=-1, output_type=tf.int32)
+            dep_codes = tf.argmax(pdeps_model.scores(tag_codes, char_codes, word_vectors), axis=-1,
+                                  output_type=tf.int32)
+            return tag_codes, dep_codes, trans_model.encodings(tag_codes, dep_codes, char_codes, word_vectors)
+
+        self.__run = _run
+
+    def __call__(self, char_codes, word_vectors):
+        """Returns arrays of tag codes, dep codes (int8) & encodings"""
+        tag_codes, dep_codes, encodings = self.__run(char_codes, word_vectors)
+        return tag_codes.numpy().astype(np.int8), dep_codes.numpy().astype(np.int8), encodings.numpy()
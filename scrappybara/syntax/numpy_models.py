@@ -0,0 +1,216 @@
+"""Inference of the parser's models with NumPy only, from the weights saved by the Keras models.
+TensorFlow isn't imported: startup is fast & BLAS threading can be tuned as for any NumPy program.
+Layers are evaluated batch-wise, masks following Keras' semantics, so predictions match the Keras models.
+"""
+import h5py
+import numpy as np
+
+import scrappybara.config as cfg
+
+
+def _read_weights(filename):
+    """Returns arrays of weights in the order of the model's layers, as Keras loads them"""
+
+    def _decode(_name):
+        return _name.decode(cfg.ENCODING) if isinstance(_name, bytes) else _name
+
+    weights = []
+    with h5py.File(str(cfg.DATA_DIR / 'models' / filename), 'r') as h5_file:
+        for layer_name in h5_file.attrs['layer_names']:
+            group = h5_file[_decode(layer_name)]
+            for weight_name in group.attrs['weight_names']:
+                weights.append(np.array(group[_decode(weight_name)], dtype=np.float32))
+    return weights
+
+
+def _sigmoid(x):
+    return 0.5 * (1. + np.tanh(0.5 * x))  # Doesn't overflow
+
+
+# LAYERS
+# -------------------------------------------------------------------------->
+
+class _Embedding(object):
+
+    def __init__(self, weights):
+        self.__embeddings = next(weights)
+
+    def __call__(self, codes):
+        return self.__embeddings[np.asarray(codes)]
+
+
+class _Dense(object):
+
+    def __init__(self, weights):
+        self.__kernel = next(weights)
+        self.__bias = next(weights)
+
+    def __call__(self, inputs):
+        """Returns logits: the softmax doesn't change the argmax"""
+        return inputs @ self.__kernel + self.__bias
+
+
+class _CharCNN(object):
+    """Char embeddings, then convolutions over windows of 2, 3, 4 & 5 characters max-pooled over the word"""
+
+    def __init__(self, weights):
+        self.__embed = _Embedding(weights)
+        self.__convolutions = [(next(weights), next(weights)) for _ in range(4)]  # Tuples (kernel, bias)
+
+    def __call__(self, char_codes):
+        embeds = self.__embed(char_codes)  # Shape (batch, timesteps, chars, embedding)
+        word_length = embeds.shape[2]
+        pools = []
+        for kernel, bias in self.__convolutions:
+            window = kernel.shape[1]
+            before = (window - 1) // 2  # 'same' padding
+            padded = np.pad(embeds, ((0, 0), (0, 0), (before, window - 1 - before), (0, 0)))
+            conv = bias + sum([padded[:, :, idx:idx + word_length] @ kernel[0, idx] for idx in range(window)])
+            pools.append(np.maximum(conv, 0.).max(axis=2))
+        return np.concatenate(pools, axis=-1)
+
+
+class _BiLSTM(object):
+    """Timesteps whose features are all zeros are masked: they output zeros & keep the state"""
+
+    def __init__(self, weights):
+        self.__forward = [next(weights) for _ in range(3)]  # kernel, recurrent kernel, bias
+        self.__backward = [next(weights) for _ in range(3)]
+
+    def __call__(self, inputs):
+        mask = np.any(inputs != 0., axis=-1)
+        forward = self.__run(inputs, mask, *self.__forward)
+        backward = self.__run(inputs[:, ::-1], mask[:, ::-1], *self.__backward)[:, ::-1]
+        return np.concatenate([forward, backward], axis=-1)
+
+    @staticmethod
+    def __run(inputs, mask, kernel, recurrent_kernel, bias):
+        batch_size, nb_timesteps, _ = inputs.shape
+        units = recurrent_kernel.shape[0]
+        # Inputs of all timesteps are projected at once
+        projections = inputs @ kernel + bias
+        state = np.zeros((batch_size, units), dtype=np.float32)
+        carry = np.zeros((batch_size, units), dtype=np.float32)
+        outputs = np.zeros((batch_size, nb_timesteps, units), dtype=np.float32)
+        for timestep in range(nb_timesteps):
+            gates = projections[:, timestep] + state @ recurrent_kernel
+            input_gate = _sigmoid(gates[:, :units])
+            forget_gate = _sigmoid(gates[:, units:units * 2])
+            new_carry = forget_gate * carry + input_gate * np.tanh(gates[:, units * 2:units * 3])
+            new_state = _sigmoid(gates[:, units * 3:]) * np.tanh(new_carry)
+            step_mask = mask[:, timestep, None]
+            carry = np.where(step_mask, new_carry, carry)
+            state = np.where(step_mask, new_state, state)
+            outputs[:, timestep] = np.where(step_mask, new_state, 0.)
+        return outputs
+
+
+# MODELS
+# -------------------------------------------------------------------------->
+
+class NumpyPTagsModel(object):
+    """Predicts part-of-speech tags for every token in a sentence"""
+
+    def __init__(self, charset_size):
+        self.__filename = 'ptags_weights.h5'
+        self.__char_cnn = None
+        self.__bilstm = None
+        self.__dense = None
+
+    def load(self):
+        weights = iter(_read_weights(self.__filename))
+        self.__char_cnn = _CharCNN(weights)
+        self.__bilstm = _BiLSTM(weights)
+        self.__dense = _Dense(weights)
+        return self
+
+    def scores(self, char_codes, word_vectors):
+        """Logits of tags"""
+        features = np.concatenate([self.__char_cnn(char_codes), np.asarray(word_vectors, dtype=np.float32)], axis=-1)
+        return self.__dense(self.__bilstm(features))
+
+    def predict(self, char_codes, word_vectors):
+        seqs = self.scores(char_codes, word_vectors)
+        return np.argmax(seqs, axis=-1).astype(np.int8)
+
+
+class NumpyPDepsModel(object):
+    """Predicts parent dependencies for every token in a sentence"""
+
+    def __init__(self, charset_size):
+        self.__filename = 'pdeps_weights.h5'
+        self.__char_cnn = None
+        self.__tag_embed = None
+        self.__bilstm = None
+        self.__dense = None
+
+    def load(self):
+        weights = iter(_read_weights(self.__filename))
+        self.__char_cnn = _CharCNN(weights)
+        self.__tag_embed = _Embedding(weights)
+        self.__bilstm = _BiLSTM(weights)
+        self.__dense = _Dense(weights)
+        return self
+
+    def scores(self, tag_codes, char_codes, word_vectors):
+        """Logits of dependencies"""
+        features = np.concatenate([self.__char_cnn(char_codes), np.asarray(word_vectors, dtype=np.float32),
+                                   self.__tag_embed(tag_codes)], axis=-1)
+        return self.__dense(self.__bilstm(features))
+
+    def predict(self, tag_codes, char_codes, word_vectors):
+        seqs = self.scores(tag_codes, char_codes, word_vectors)
+        return np.argmax(seqs, axis=-1).astype(np.int8)
+
+
+class NumpyTransModel(object):
+    """Predicts parsing transition, with an encoder run once per sentence & a head run at every transition"""
+
+    def __init__(self, charset_size):
+        self.__filename = 'trans_weights.h5'
+        self.__char_cnn = None
+        self.__tag_embed = None
+        self.__dep_embed = None
+        self.__bilstm = None
+        self.__dense = None
+        self.__probas = None
+
+    def load(self):
+        weights = iter(_read_weights(self.__filename))
+        self.__char_cnn = _CharCNN(weights)
+        self.__tag_embed = _Embedding(weights)
+        self.__dep_embed = _Embedding(weights)
+        self.__bilstm = _BiLSTM(weights)
+        self.__dense = _Dense(weights)
+        self.__probas = _Dense(weights)
+        return self
+
+    def encode(self, tag_codes, dep_codes, char_codes, word_vectors):
+        """Returns the BiLSTM encodings of every timestep of every sentence"""
+        features = np.concatenate([self.__char_cnn(char_codes), np.asarray(word_vectors, dtype=np.float32),
+                                   self.__tag_embed(tag_codes), self.__dep_embed(dep_codes)], axis=-1)
+        return self.__bilstm(features)
+
+    def predict(self, encodings_1, encodings_2):
+        """Args are the encodings of the stack's top & of the buffer's head"""
+        hidden = np.maximum(self.__dense(np.concatenate([encodings_1, encodings_2], axis=1)), 0.)
+        return np.argmax(self.__probas(hidden), axis=-1).astype(np.int8)
+
+
+class NumpyFusedModel(object):
+    """Predicts tags, then dependencies, then encodes sentences for transitions.
+    Codes stay in arrays from a model to the next.
+    """
+
+    def __init__(self, ptags_model, pdeps_model, trans_model):
+        self.__ptags_model = ptags_model
+        self.__pdeps_model = pdeps_model
+        self.__trans_model = trans_model
+
+    def __call__(self, char_codes, word_vectors):
+        """Returns arrays of tag codes, dep codes (int8) & encodings"""
+        char_codes = np.asarray(char_codes)
+        word_vectors = np.asarray(word_vectors, dtype=np.float32)
+        tag_codes = self.__ptags_model.predict(char_codes, word_vectors)
+        dep_codes = self.__pdeps_model.predict(tag_codes, char_codes, word_vectors)
+        return tag_codes, dep_codes, self.__trans_model.encode(tag_codes, dep_codes, char_codes, word_vectors)
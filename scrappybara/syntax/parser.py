@@ -1,146 +1,261 @@
-import collections
 import os
 
+import numpy as np
+
 import scrappybara.config as cfg
+from scrappybara.exceptions import ArgumentValueError
 from scrappybara.syntax.charset import Charset
 from scrappybara.syntax.dependencies import Dep
-from scrappybara.syntax.models import PDepsModel, TransModel
-from scrappybara.syntax.models import PTagsModel
 from scrappybara.syntax.tags import Tag
-from scrappybara.syntax.training_samples import vectorize_sentence, make_masks
+from scrappybara.syntax.training_samples import vectorize_sentences
 from scrappybara.syntax.transitions import Trans
 from scrappybara.syntax.wordset import Wordset
-from scrappybara.utils.multithreading import run_multithreads
+from scrappybara.utils.cache import LRUCache
 from scrappybara.utils.mutables import make_batches
+from scrappybara.utils.stages import run_stages
 from scrappybara.utils.tree import Tree
 
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
 
 
-class _Parse(object):
-    """Parsing a single sentence"""
-
-    def __init__(self, seq_length, tag_codes, dep_codes, char_codes, word_vectors):
-        """Tokens & deps are non-padded"""
-        self.__tag_codes = tag_codes
-        self.__dep_codes = dep_codes
-        self.__char_codes = char_codes
-        self.__word_vectors = word_vectors
-        self.tags = [Tag(code) for code in tag_codes[1:seq_length - 1]]
-        self.__deps = [Dep(code) for code in dep_codes[1:seq_length - 1]]
-        self.__buffer = collections.deque([idx for idx in range(seq_length - 2) if self.__deps[idx] != Dep.NODEP])
-        self.__stack = collections.deque([])
-        if self.__buffer:
-            self.__shift()
-        self.arcs = []  # Tuples (dep, parent_idx, child_idx)
-
-    def __pdep(self, child_idx):
-        pdep = self.__deps[child_idx]
-        if pdep == Dep.ROOT:
-            return Dep.SPLIT  # ROOT cannot have any parent
-        return pdep
-
-    def __shift(self):
-        self.__stack.append(self.__buffer.popleft())
-
-    def __reduce(self):
-        self.__stack.pop()
-        if not self.__stack:
-            self.__shift()
+def _model_classes(backend):
+    """Returns classes of the models of tags, dependencies & transitions, & of their fusion.
+    Backends are imported lazily: each one has its own startup cost.
+    """
+    if backend == 'keras':
+        from scrappybara.syntax.models import PTagsModel, PDepsModel, TransModel, FusedModel
+        return PTagsModel, PDepsModel, TransModel, FusedModel
+    if backend == 'saved_model':
+        from scrappybara.syntax.models import FusedModel
+        from scrappybara.syntax.saved_models import SavedPTagsModel, SavedPDepsModel, SavedTransModel
+        return SavedPTagsModel, SavedPDepsModel, SavedTransModel, FusedModel
+    if backend == 'numpy':
+        from scrappybara.syntax.numpy_models import NumpyPTagsModel, NumpyPDepsModel, NumpyTransModel, \
+            NumpyFusedModel
+        return NumpyPTagsModel, NumpyPDepsModel, NumpyTransModel, NumpyFusedModel
+    raise ArgumentValueError('backend', backend, cfg.PARSER_BACKENDS)
+
+
+# Code => enum member, faster than calling the enum for every token
+_TAGS = tuple(Tag)
+_DEPS = tuple(Dep)
+
+
+class _ParseSlots(object):
+    """Arc-eager parsing of sentences held in a fixed number of slots.
+    A slot is freed as soon as its sentence is parsed, so a new sentence can take it while others are still parsed.
+    States of all slots are stored in arrays, so a batch of transitions is registered at once:
+      * buffer: indexes of tokens to attach (NODEP tokens are skipped) & the position of its head
+      * stack: indexes of tokens & its size
+      * arcs: dependencies, parents & children, in the order they're created
+    """
+
+    def __init__(self, nb_slots, padded_length):
+        """Arg padded_length is the maximum padded length of admitted sentences"""
+        self.__occupied = np.zeros(nb_slots, dtype=bool)
+        self.__lengths = np.zeros(nb_slots, dtype=np.int64)  # Numbers of tokens
+        self.__tag_codes = np.zeros((nb_slots, padded_length), dtype=np.int8)
+        self.__pdeps = np.zeros((nb_slots, padded_length), dtype=np.int8)
+        self.__encodings = None  # BiLSTM encodings of the padded sentences, allocated on first admission
+        self.__buffers = np.zeros((nb_slots, padded_length), dtype=np.int64)
+        self.__buffer_sizes = np.zeros(nb_slots, dtype=np.int64)
+        self.__buffer_heads = np.zeros(nb_slots, dtype=np.int64)
+        # A token is pushed once at most. Transitions aren't checked, so a token can get a parent from a right arc,
+        # then another one from a left arc: there are fewer arcs than pushes (right arcs) + pops (left arcs).
+        self.__stacks = np.zeros((nb_slots, padded_length), dtype=np.int64)
+        self.__stack_sizes = np.zeros(nb_slots, dtype=np.int64)
+        self.__arc_deps = np.zeros((nb_slots, 2 * padded_length), dtype=np.int8)
+        self.__arc_parents = np.zeros((nb_slots, 2 * padded_length), dtype=np.int64)
+        self.__arc_children = np.zeros((nb_slots, 2 * padded_length), dtype=np.int64)
+        self.__nb_arcs = np.zeros(nb_slots, dtype=np.int64)
+
+    def __shift(self, slots):
+        """Pushes the buffer's head on the stack"""
+        self.__stacks[slots, self.__stack_sizes[slots]] = self.__buffers[slots, self.__buffer_heads[slots]]
+        self.__stack_sizes[slots] += 1
+        self.__buffer_heads[slots] += 1
 
     @property
-    def complete(self):
-        return not self.__buffer
+    def free(self):
+        return np.flatnonzero(~self.__occupied)
 
     @property
-    def root(self):
-        cands = set()
-        cannot_be_root = set()
-        for _, pdix, cidx in self.arcs:
-            cands |= {pdix, cidx}
-            cannot_be_root.add(cidx)
-        try:
-            return sorted(cands - cannot_be_root)[0]
-        except IndexError:
-            return None
+    def incomplete(self):
+        """Slots of sentences whose buffer isn't empty"""
+        return np.flatnonzero(self.__occupied & (self.__buffer_heads < self.__buffer_sizes))
 
     @property
-    def mats(self):
-        """Materials for predicting the next transition"""
-        mask_1, mask_2 = make_masks(self.__stack[-1] + 1, self.__buffer[0] + 1)
-        return self.__tag_codes, self.__dep_codes, self.__char_codes, self.__word_vectors, mask_1, mask_2
-
-    def register_transition(self, trans):
-        if trans == Trans.LEFT:
-            self.arcs.append((self.__pdep(self.__stack[-1]), self.__buffer[0], self.__stack[-1]))
-            self.__reduce()
-        elif trans == Trans.RIGHT:
-            self.arcs.append((self.__pdep(self.__buffer[0]), self.__stack[-1], self.__buffer[0]))
-            self.__shift()
-        elif trans == Trans.REDUCE:
-            self.__reduce()
-        elif trans == Trans.SHIFT:
-            self.__shift()
-
-
-def _build_tree(parse):
-    """Converts parse to tree, returns None if no root is detected"""
-    root = parse.root
+    def complete(self):
+        return np.flatnonzero(self.__occupied & (self.__buffer_heads >= self.__buffer_sizes))
+
+    def admit(self, slots, seq_lengths, tag_codes, dep_codes, encodings):
+        """Args are arrays of the padded sentences & their BiLSTM encodings, 1 row per slot"""
+        if self.__encodings is None:
+            self.__encodings = np.zeros((len(self.__occupied), self.__tag_codes.shape[1], encodings.shape[-1]),
+                                        dtype=encodings.dtype)
+        nb_tokens = dep_codes.shape[1] - 1
+        lengths = np.asarray(seq_lengths) - 2
+        deps = dep_codes[:, 1:]
+        to_attach = (deps != Dep.NODEP) & (np.arange(nb_tokens) < lengths[:, None])
+        self.__occupied[slots] = True
+        self.__lengths[slots] = lengths
+        self.__tag_codes[slots, :nb_tokens] = tag_codes[:, 1:]
+        self.__pdeps[slots, :nb_tokens] = np.where(deps == Dep.ROOT, Dep.SPLIT, deps)  # ROOT cannot have any parent
+        self.__encodings[slots, :nb_tokens + 1] = encodings
+        # Buffers: tokens to attach come first, in order
+        self.__buffers[slots, :nb_tokens] = np.argsort(~to_attach, axis=1, kind='stable')
+        self.__buffer_sizes[slots] = to_attach.sum(axis=1)
+        self.__buffer_heads[slots] = 0
+        self.__stack_sizes[slots] = 0
+        self.__nb_arcs[slots] = 0
+        self.__shift(slots[self.__buffer_sizes[slots] > 0])
+
+    def encodings(self, slots):
+        """Encodings of the stack's top & the buffer's head, for predicting the next transition"""
+        tops = self.__stacks[slots, self.__stack_sizes[slots] - 1]
+        heads = self.__buffers[slots, self.__buffer_heads[slots]]
+        return self.__encodings[slots, tops + 1], self.__encodings[slots, heads + 1]
+
+    def register_transitions(self, slots, transitions):
+        tops = self.__stacks[slots, self.__stack_sizes[slots] - 1]
+        heads = self.__buffers[slots, self.__buffer_heads[slots]]
+        lefts = transitions == Trans.LEFT
+        rights = transitions == Trans.RIGHT
+        # Left arcs attach the stack's top to the buffer's head, right arcs do the opposite
+        arcs = lefts | rights
+        arc_slots = slots[arcs]
+        children = np.where(lefts, tops, heads)[arcs]
+        arc_idxs = self.__nb_arcs[arc_slots]
+        self.__arc_deps[arc_slots, arc_idxs] = self.__pdeps[arc_slots, children]
+        self.__arc_parents[arc_slots, arc_idxs] = np.where(lefts, heads, tops)[arcs]
+        self.__arc_children[arc_slots, arc_idxs] = children
+        self.__nb_arcs[arc_slots] += 1
+        # Left arcs & reduces pop the stack, right arcs & shifts push the buffer's head
+        self.__stack_sizes[slots[lefts | (transitions == Trans.REDUCE)]] -= 1
+        self.__shift(slots[rights | (transitions == Trans.SHIFT)])
+        # An empty stack gets the buffer's head
+        self.__shift(slots[self.__stack_sizes[slots] == 0])
+
+    def release(self, slots):
+        """Frees slots & returns a tuple (tags, root, arcs) per sentence. Root is None if it isn't detected."""
+        results = []
+        for slot in slots.tolist():
+            nb_arcs = self.__nb_arcs[slot]
+            parents = self.__arc_parents[slot, :nb_arcs].tolist()
+            children = self.__arc_children[slot, :nb_arcs].tolist()
+            arcs = tuple(zip([_DEPS[dep] for dep in self.__arc_deps[slot, :nb_arcs].tolist()], parents, children))
+            roots = set(parents) - set(children)
+            tags = tuple([_TAGS[code] for code in self.__tag_codes[slot, :self.__lengths[slot]].tolist()])
+            results.append((tags, min(roots) if roots else None, arcs))
+        self.__occupied[slots] = False
+        return results
+
+
+def _build_tree(root, arcs):
+    """Converts arcs of a parse to tree, returns None if no root is detected"""
     if root is None:
         return None
     else:
         tree = Tree(root)
-        for dep, parent_idx, child_idx in parse.arcs:
+        for dep, parent_idx, child_idx in arcs:
             tree.register_child(dep, parent_idx, child_idx)
         return tree
 
 
 class Parser(object):
 
-    def __init__(self, language_model, batch_size):
+    def __init__(self, language_model, batch_size, cache_size=cfg.PARSER_CACHE_SIZE, backend=cfg.PARSER_BACKEND):
+        ptags_class, pdeps_class, trans_class, fused_class = _model_classes(backend)
         self.__batch_size = batch_size
+        self.__cache = LRUCache(cache_size)  # tokens => (tags, root, arcs)
         self.__charset = Charset().load()
         self.__wordset = Wordset(language_model).load()
-        self.__ptags_model = PTagsModel(len(self.__charset)).load()
-        self.__pdeps_model = PDepsModel(len(self.__charset)).load()
-        self.__trans_model = TransModel(len(self.__charset)).load()
+        ptags_model = ptags_class(len(self.__charset)).load()
+        pdeps_model = pdeps_class(len(self.__charset)).load()
+        self.__trans_model = trans_class(len(self.__charset)).load()
+        self.__fused_model = fused_class(ptags_model, pdeps_model, self.__trans_model)
+
+    @property
+    def cache_stats(self):
+        return self.__cache.stats
+
+    @property
+    def wordset_cache_stats(self):
+        """Stats of the caches of word ids & of standardized tokens"""
+        return self.__wordset.cache_stats, self.__wordset.standardizer_cache_stats
 
     def __call__(self, token_lists):
-        """Parses sentences by batch"""
-        mats = run_multithreads(token_lists, self.__vectorize_sentence, cfg.NB_PROCESSES)
-        batches = make_batches(mats, self.__batch_size)
-        all_parses = []
-        for batch in batches:
-            seq_lengths, char_codes, word_vectors = zip(*batch)
-            tag_codes = self.__predict_tags(char_codes, word_vectors)
-            dep_codes = self.__predict_deps(tag_codes, char_codes, word_vectors)
-            for idx, seq_length in enumerate(seq_lengths):
-                all_parses.append(
-                    _Parse(seq_length, tag_codes[idx], dep_codes[idx], char_codes[idx], word_vectors[idx]))
-        # Predict transitions
-        incomplete_parses = [parse for parse in all_parses if not parse.complete]
-        while incomplete_parses:
-            parse_batches = make_batches(incomplete_parses, self.__batch_size)
-            for batch in parse_batches:
-                self.__predict_transitions(batch)
-            incomplete_parses = [parse for parse in all_parses if not parse.complete]
-        # Prepare results
-        all_tags = [parse.tags for parse in all_parses]
-        all_trees = run_multithreads(all_parses, _build_tree, cfg.NB_PROCESSES)
+        """Parses sentences by batch.
+        Identical sentences are parsed once, & parses are memoized across calls.
+        Trees are built for each sentence, so they can be used concurrently.
+        """
+        results = [None] * len(token_lists)  # Tuples (tags, root, arcs)
+        token_idxs = {}  # tokens to parse => indexes of sentences
+        for idx, tokens in enumerate(token_lists):
+            tokens = tuple(tokens)
+            if tokens in token_idxs:
+                token_idxs[tokens].append(idx)
+                continue
+            try:
+                results[idx] = self.__cache[tokens]
+            except KeyError:
+                token_idxs[tokens] = [idx]
+        for tokens, result in zip(token_idxs, self.__parse([list(tokens) for tokens in token_idxs])):
+            self.__cache[tokens] = result
+            for idx in token_idxs[tokens]:
+                results[idx] = result
+        all_tags = [list(tags) for tags, _, _ in results]
+        all_trees = [_build_tree(root, arcs) for _, root, arcs in results]
         return all_tags, all_trees
 
-    def __vectorize_sentence(self, tokens):
-        return vectorize_sentence(tokens, self.__charset, self.__wordset)
-
-    def __predict_tags(self, char_codes, word_vectors):
-        return self.__ptags_model.predict(char_codes, word_vectors)
+    def __parse(self, token_lists):
+        """Returns a tuple (tags, root, arcs) per sentence.
+        Transitions are predicted for a full batch of slots: as soon as sentences are parsed, their slots are given
+        to new sentences, whose tags, dependencies & encodings are predicted when no sentence is waiting.
+        """
+        results = [None] * len(token_lists)
+        if not token_lists:
+            return results
+        slots = _ParseSlots(self.__batch_size, cfg.PADDED_SENT_LENGTH)
+        slot_idxs = np.zeros(self.__batch_size, dtype=np.int64)  # Slot => index of its sentence
+        batches = self.__encode_batches(token_lists)
+        waiting = []  # Arrays of sentences waiting for a slot: indexes, lengths, tag codes, dep codes & encodings
+        exhausted = False
+        while True:
+            # Admit waiting sentences in free slots
+            free = slots.free
+            while len(free) and not exhausted:
+                if not waiting or not len(waiting[0]):
+                    waiting = next(batches, [])
+                    exhausted = not waiting
+                    continue
+                nb_admitted = min(len(free), len(waiting[0]))
+                slots.admit(free[:nb_admitted], *[array[:nb_admitted] for array in waiting[1:]])
+                slot_idxs[free[:nb_admitted]] = waiting[0][:nb_admitted]
+                waiting = [array[nb_admitted:] for array in waiting]
+                free = free[nb_admitted:]
+            # Release parsed sentences
+            complete = slots.complete
+            for slot, result in zip(complete, slots.release(complete)):
+                results[slot_idxs[slot]] = result
+            incomplete = slots.incomplete
+            if len(incomplete):
+                slots.register_transitions(incomplete, self.__trans_model.predict(*slots.encodings(incomplete)))
+            elif exhausted:
+                return results
 
-    def __predict_deps(self, tag_codes, char_codes, word_vectors):
-        return self.__pdeps_model.predict(tag_codes, char_codes, word_vectors)
+    def __vectorize_batch(self, batch_idxs, token_lists):
+        """Returns indexes of sentences, lengths, char codes & word vectors of a batch"""
+        batch = [token_lists[idx] for idx in batch_idxs]
+        return [np.array(batch_idxs)] + list(vectorize_sentences(batch, self.__charset, self.__wordset))
 
-    def __predict_transitions(self, parses):
-        """Predicts next transitions & registers them in place"""
-        tag_codes, dep_codes, char_codes, word_vectors, masks_1, masks_2 = zip(*[parse.mats for parse in parses])
-        predictions = self.__trans_model.predict(tag_codes, dep_codes, char_codes, word_vectors, masks_1, masks_2)
-        for idx, trans in enumerate(predictions):
-            parses[idx].register_transition(trans)
+    def __encode_batches(self, token_lists):
+        """Yields arrays of a batch: indexes of sentences, lengths, tag codes, dep codes & encodings.
+        Next batch is vectorized in a thread while the models run on the current one.
+        """
+        batches = run_stages(make_batches(list(range(len(token_lists))), self.__batch_size),
+                             [lambda batch_idxs: self.__vectorize_batch(batch_idxs, token_lists)],
+                             cfg.PIPELINE_QUEUE_SIZE)
+        for batch_idxs, seq_lengths, char_codes, word_vectors in batches:
+            # Tags, dependencies & encodings for transitions are predicted in one pass
+            yield [batch_idxs, seq_lengths] + list(self.__fused_model(char_codes, word_vectors))
@@ -0,0 +1,72 @@
+"""Inference from the SavedModels exported by the Keras models, with the same interface.
+Loading a SavedModel doesn't build the Keras graphs in python, so the parser starts much faster.
+"""
+import numpy as np
+import tensorflow as tf
+
+import scrappybara.config as cfg
+from scrappybara.syntax.models import SAVED_MODEL_DIRS, PTagsModel, PDepsModel, TransModel
+from scrappybara.utils.files import path_exists
+
+
+class _SavedModel(object):
+
+    def __init__(self, name, keras_class, charset_size):
+        self.__name = name
+        self.__keras_class = keras_class
+        self.__charset_size = charset_size
+        self._module = None
+
+    def load(self):
+        # Exported once from the Keras model if missing
+        path = cfg.DATA_DIR / 'models' / SAVED_MODEL_DIRS[self.__name]
+        if not path_exists(path):
+            self.__keras_class(self.__charset_size).load().export()
+        self._module = tf.saved_model.load(str(path))
+        return self
+
+
+class SavedPTagsModel(_SavedModel):
+
+    def __init__(self, charset_size):
+        super().__init__('ptags', PTagsModel, charset_size)
+
+    def scores(self, char_codes, word_vectors):
+        return self._module.predict(char_codes, word_vectors)
+
+    def predict(self, char_codes, word_vectors):
+        seqs = self._module.predict(np.asarray(char_codes, dtype=np.int32),
+                                    np.asarray(word_vectors, dtype=np.float32)).numpy()
+        return np.argmax(seqs, axis=-1).astype(np.int8)
+
+
+class SavedPDepsModel(_SavedModel):
+
+    def __init__(self, charset_size):
+        super().__init__('pdeps', PDepsModel, charset_size)
+
+    def scores(self, tag_codes, char_codes, word_vectors):
+        return self._module.predict(tag_codes, char_codes, word_vectors)
+
+    def predict(self, tag_codes, char_codes, word_vectors):
+        seqs = self._module.predict(np.asarray(tag_codes, dtype=np.int32), np.asarray(char_codes, dtype=np.int32),
+                                    np.asarray(word_vectors, dtype=np.float32)).numpy()
+        return np.argmax(seqs, axis=-1).astype(np.int8)
+
+
+class SavedTransModel(_SavedModel):
+
+    def __init__(self, charset_size):
+        super().__init__('trans', TransModel, charset_size)
+
+    def encodings(self, tag_codes, dep_codes, char_codes, word_vectors):
+        return self._module.encode(tag_codes, dep_codes, char_codes, word_vectors)
+
+    def encode(self, tag_codes, dep_codes, char_codes, word_vectors):
+        return self._module.encode(np.asarray(tag_codes, dtype=np.int32), np.asarray(dep_codes, dtype=np.int32),
+                                   np.asarray(char_codes, dtype=np.int32),
+                                   np.asarray(word_vectors, dtype=np.float32)).numpy()
+
+    def predict(self, encodings_1, encodings_2):
+        batch_probas = self._module.predict(np.concatenate([encodings_1, encodings_2], axis=1).astype(np.float32))
+        return np.argmax(batch_probas.numpy(), axis=-1).astype(np.int8)
@@ -13,37 +13,10 @@ def _pad_array(array, dim):
     return result
 
 
-def _fill_columns(matrix, dim):
-    """Fill matrix columns with 0's"""
-    arrays_len = len(matrix)
-    result = (np.zeros((arrays_len, dim), dtype=np.int32))
-    for idx, array in enumerate(matrix):
-        result[idx] = _pad_array(array, dim)
-    return result
-
-
-def _pad_char_codes(matrix):
-    """Pads sentence's char codes"""
-    empty_arrays = _fill_columns([[] for _ in range(cfg.PADDED_SENT_LENGTH - len(matrix))],
-                                 cfg.PADDED_WORD_LENGTH)
-    padded_arrays = _fill_columns(matrix[:cfg.PADDED_SENT_LENGTH], cfg.PADDED_WORD_LENGTH)
-    return np.concatenate((padded_arrays, empty_arrays))
-
-
-def _pad_word_vectors(matrix):
-    """Pads sentence's word vectors"""
-    assert all([len(array) == len(matrix[0]) for array in matrix])
-    result = (np.zeros((cfg.PADDED_SENT_LENGTH, len(matrix[0])), dtype=np.float32))
-    for idx, array in enumerate(matrix):
-        result[idx] = array
-    return result
-
-
-def _encode_chars(token, charset):
-    if len(token) > cfg.MAX_WORD_LENGTH:
-        token = token[len(token) - cfg.MAX_WORD_LENGTH:]  # Truncate beginning of word if too long
-    token = '†' + token + '‡'
-    return [charset[char] for char in token]
+def _positions(lengths):
+    """Position of each element inside its group, given the lengths of consecutive groups"""
+    starts = np.cumsum(lengths) - lengths
+    return np.arange(np.sum(lengths)) - np.repeat(starts, lengths)
 
 
 class SentenceTooLongError(Exception):
@@ -63,14 +36,32 @@ def make_masks(idx_1, idx_2):
     return _make_mask(idx_1), _make_mask(idx_2)
 
 
+def vectorize_sentences(token_lists, charset, wordset):
+    """Returns sequence lengths & padded numpy arrays of a batch of sentences"""
+    if any([len(tokens) > cfg.MAX_SENT_LENGTH for tokens in token_lists]):
+        raise SentenceTooLongError()
+    token_lists = [['ʃʃʃ'] + tokens + ['ʄʄʄ'] for tokens in token_lists]
+    seq_lengths = np.array([len(tokens) for tokens in token_lists], dtype=np.int32)
+    tokens = [token for tokens in token_lists for token in tokens]
+    # Coordinates of each token in the batch
+    sent_idxs = np.repeat(np.arange(len(token_lists)), seq_lengths)
+    token_idxs = _positions(seq_lengths)
+    # Char codes (truncate beginning of word if too long)
+    words = ['†' + token[-cfg.MAX_WORD_LENGTH:] + '‡' for token in tokens]
+    word_lengths = np.array([len(word) for word in words], dtype=np.int32)
+    word_idxs = np.repeat(np.arange(len(words)), word_lengths)
+    char_codes = np.zeros((len(token_lists), cfg.PADDED_SENT_LENGTH, cfg.PADDED_WORD_LENGTH), dtype=np.int32)
+    char_codes[sent_idxs[word_idxs], token_idxs[word_idxs], _positions(word_lengths)] = charset.encode(''.join(words))
+    # Word vectors
+    word_vectors = np.zeros((len(token_lists), cfg.PADDED_SENT_LENGTH, cfg.WORD_VECTOR_SIZE), dtype=np.float32)
+    word_vectors[sent_idxs, token_idxs] = wordset.vectors(tokens)
+    return seq_lengths, char_codes, word_vectors
+
+
 def vectorize_sentence(tokens, charset, wordset):
     """Returns sequence length & padded numpy arrays"""
-    if len(tokens) > cfg.MAX_SENT_LENGTH:
-        raise SentenceTooLongError()
-    tokens = ['ʃʃʃ'] + tokens + ['ʄʄʄ']
-    char_codes = _pad_char_codes([_encode_chars(token, charset) for token in tokens])
-    word_vectors = _pad_word_vectors([wordset[token] for token in tokens])
-    return len(tokens), char_codes, word_vectors
+    seq_lengths, char_codes, word_vectors = vectorize_sentences([tokens], charset, wordset)
+    return int(seq_lengths[0]), char_codes[0], word_vectors[0]
 
 
 class _TrainingSample(object):
@@ -2,35 +2,68 @@ import numpy as np
 
 import scrappybara.config as cfg
 from scrappybara.normalization.standardizer import Standardizer
-from scrappybara.utils.files import save_pkl_file, load_pkl_file
+from scrappybara.utils.cache import LRUCache
+from scrappybara.utils.files import atomic_path, save_pkl_file, save_npy_file, load_pkl_file, path_exists
 
 
 class Wordset(object):
+    """Word vectors are stored in a single matrix, memory-mapped so processes share its pages.
+    Row 0 is the zero vector of unknown words.
+    """
 
     def __init__(self, language_model):
         self.__lm = language_model
         self.__standardize = Standardizer(language_model)
-        self.__filepath = cfg.DATA_DIR / 'models' / 'word_vectors.pkl'
-        self.__word_vector = None  # word => vector
-        self.__zero_vector = np.zeros(cfg.WORD_VECTOR_SIZE)
+        self.__pkl_filepath = cfg.DATA_DIR / 'models' / 'word_vectors.pkl'  # word => vector (downloaded format)
+        self.__ids_filepath = cfg.DATA_DIR / 'models' / 'word_ids.pkl'
+        self.__matrix_filepath = cfg.DATA_DIR / 'models' / 'word_vectors.npy'
+        self.__word_id = None  # word => row of the matrix
+        self.__matrix = None  # word vectors
+        # Memoized on the raw token, so standardization runs once per distinct token
+        self.__cache = LRUCache(cfg.WORDSET_CACHE_SIZE)  # token => row of the matrix
 
     def __len__(self):
-        return len(self.__word_vector) + 1
+        return len(self.__word_id) + 1
 
     def __getitem__(self, word):
         """Returns the vector of a given word"""
+        return self.__matrix[self.__token_id(word)]
+
+    def __token_id(self, token):
         try:
-            word = self.__standardize(word)
-            return self.__word_vector[word]
+            return self.__cache[token]
         except KeyError:
-            return self.__zero_vector
+            word_id = self.__word_id.get(self.__standardize(token), 0)
+            self.__cache[token] = word_id
+            return word_id
+
+    @property
+    def cache_stats(self):
+        return self.__cache.stats
+
+    @property
+    def standardizer_cache_stats(self):
+        return self.__standardize.cache_stats
+
+    def ids(self, words):
+        """Returns the ids of a list of words"""
+        return np.array([self.__token_id(word) for word in words], dtype=np.int32)
+
+    def vectors(self, words):
+        """Returns the vectors of a list of words as a matrix"""
+        return self.__matrix[self.ids(words)]
 
     def load(self):
-        self.__word_vector = load_pkl_file(self.__filepath)
+        # The downloaded dictionary of word=>vector is converted once.
+        # Files are written atomically, so concurrent processes never load a partial file.
+        if not all([path_exists(self.__ids_filepath), path_exists(self.__matrix_filepath)]):
+            self.__write(load_pkl_file(self.__pkl_filepath))
+        self.__word_id = load_pkl_file(self.__ids_filepath)
+        self.__matrix = np.load(self.__matrix_filepath, mmap_mode='r')
         return self
 
     def save(self, wordvec_folder):
-        """Save dictionary of word=>vector as a pkl file"""
+        """Save vocabulary & matrix of word vectors"""
         file_path = wordvec_folder + '/glove.6B.%sd.txt' % str(cfg.WORD_VECTOR_SIZE)
         word_vector = {}
         with open(file_path, encoding=cfg.ENCODING) as txt_file:
@@ -40,4 +73,15 @@ class Wordset(object):
                 wordvec = values[1:]
                 if self.__lm.has_ngram(word):
                     word_vector[word] = np.asarray(wordvec, dtype=np.float32)
-        save_pkl_file(word_vector, self.__filepath)
+        save_pkl_file(word_vector, self.__pkl_filepath)
+        self.__write(word_vector)
+
+    def __write(self, word_vector):
+        """Converts a dictionary of word=>vector into a vocabulary & a matrix"""
+        word_id = {word: idx + 1 for idx, word in enumerate(sorted(word_vector))}
+        matrix = np.zeros((len(word_id) + 1, cfg.WORD_VECTOR_SIZE), dtype=np.float32)
+        for word, idx in word_id.items():
+            matrix[idx] = word_vector[word]
+        save_npy_file(matrix, self.__matrix_filepath)
+        with atomic_path(self.__ids_filepath) as tmp_path:
+            save_pkl_file(word_id, tmp_path)
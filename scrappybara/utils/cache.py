@@ -0,0 +1,61 @@
+import collections
+import threading
+
+
+class LRUCache(object):
+    """Thread-safe dictionary that keeps a maximum number of entries.
+    When full, the least recently used entry is evicted.
+    Hits & misses are counted to help tuning the size.
+    """
+
+    def __init__(self, max_size):
+        self.__max_size = max_size
+        self.__entries = collections.OrderedDict()
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __contains__(self, key):
+        return key in self.__entries
+
+    def __getitem__(self, key):
+        """Raises KeyError on a miss"""
+        with self.__lock:
+            try:
+                value = self.__entries[key]
+            except KeyError:
+                self.__misses += 1
+                raise
+            self.__entries.move_to_end(key)
+            self.__hits += 1
+            return value
+
+    def __setitem__(self, key, value):
+        if self.__max_size < 1:
+            return
+        with self.__lock:
+            self.__entries[key] = value
+            self.__entries.move_to_end(key)
+            if len(self.__entries) > self.__max_size:
+                self.__entries.popitem(last=False)
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+            self.__hits = 0
+            self.__misses = 0
+
+    @property
+    def stats(self):
+        """Returns a dictionary of statistics"""
+        lookups = self.__hits + self.__misses
+        return {
+            'hits': self.__hits,
+            'misses': self.__misses,
+            'hit_rate': self.__hits / lookups if lookups else 0.0,
+            'size': len(self.__entries),
+            'max_size': self.__max_size,
+        }
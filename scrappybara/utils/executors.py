@@ -0,0 +1,148 @@
+"""Executors run a process over a list of items & return outputs in the same order.
+Backends:
+  * inline: runs in the calling thread
+  * thread: persistent pool of threads, only useful for processes that release the GIL (I/O, numpy, TensorFlow)
+  * process: persistent pool of forked processes, for pure-python CPU work.
+    Workers share the memory pages of the parent, so read-only resources loaded before the fork aren't copied.
+"""
+import gc
+import itertools
+import math
+import multiprocessing
+import multiprocessing.pool
+
+from scrappybara.exceptions import ArgumentValueError
+from scrappybara.utils.mutables import make_batches
+
+BACKENDS = {'inline', 'thread', 'process'}
+
+# Processes inherited by forked workers: executor key => list of processes
+_REGISTERED_PROCESSES = {}
+_EXECUTOR_KEYS = itertools.count()
+
+
+def _chunk_size(nb_items, nb_workers):
+    """About 4 chunks per worker: workers stay busy while the overhead per chunk is amortized"""
+    return max(1, math.ceil(nb_items / (nb_workers * 4)))
+
+
+def _run_chunk(process, chunk):
+    return [process(item) for item in chunk]
+
+
+def _run_registered_chunk(executor_key, process_idx, chunk):
+    """Runs in a forked worker"""
+    return _run_chunk(_REGISTERED_PROCESSES[executor_key][process_idx], chunk)
+
+
+class InlineExecutor(object):
+
+    def __init__(self, nb_workers=1):
+        self._nb_workers = nb_workers
+
+    def register(self, process):
+        """Declares a process that will be mapped by this executor"""
+        pass
+
+    def start(self):
+        return self
+
+    def map(self, process, items):
+        return [process(item) for item in items]
+
+    def close(self):
+        pass
+
+
+class _PoolExecutor(InlineExecutor):
+
+    def __init__(self, nb_workers):
+        super().__init__(nb_workers)
+        self._pool = None
+
+    def _make_pool(self):
+        raise NotImplementedError
+
+    def _apply_async(self, process, chunk):
+        return self._pool.apply_async(_run_chunk, (process, chunk))
+
+    def start(self):
+        if self._pool is None:
+            self._pool = self._make_pool()
+        return self
+
+    def map(self, process, items):
+        items = list(items)
+        if len(items) < 2 or self._nb_workers < 2:
+            return super().map(process, items)
+        self.start()
+        results = [self._apply_async(process, chunk)
+                   for chunk in make_batches(items, _chunk_size(len(items), self._nb_workers))]
+        return [output for result in results for output in result.get()]
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+
+class ThreadExecutor(_PoolExecutor):
+
+    def _make_pool(self):
+        return multiprocessing.pool.ThreadPool(self._nb_workers)
+
+
+class ProcessExecutor(_PoolExecutor):
+    """Processes registered before the pool starts are inherited by the forked workers, with all the data they
+    reference: only items & outputs are pickled. Processes that are not registered must be picklable.
+    """
+
+    def __init__(self, nb_workers):
+        super().__init__(nb_workers)
+        self.__key = next(_EXECUTOR_KEYS)
+        _REGISTERED_PROCESSES[self.__key] = []
+
+    def register(self, process):
+        assert self._pool is None, 'Processes must be registered before the pool starts.'
+        _REGISTERED_PROCESSES[self.__key].append(process)
+
+    def _make_pool(self):
+        return multiprocessing.get_context('fork').Pool(self._nb_workers)
+
+    def start(self):
+        """Forks the workers.
+        Objects allocated so far are frozen while forking: the garbage collector of a worker would otherwise write in
+        every inherited object, copying the memory pages of the parent. The parent unfreezes them right after.
+        """
+        if self._pool is None and hasattr(gc, 'freeze'):  # python 3.7+
+            gc.collect()
+            gc.freeze()
+            try:
+                return super().start()
+            finally:
+                gc.unfreeze()
+        return super().start()
+
+    def _apply_async(self, process, chunk):
+        try:
+            process_idx = _REGISTERED_PROCESSES[self.__key].index(process)
+        except (KeyError, ValueError):
+            return super()._apply_async(process, chunk)
+        return self._pool.apply_async(_run_registered_chunk, (self.__key, process_idx, chunk))
+
+    def close(self):
+        """Also unregisters processes, which would otherwise keep alive the objects they're bound to"""
+        super().close()
+        _REGISTERED_PROCESSES.pop(self.__key, None)
+
+
+def make_executor(backend, nb_workers):
+    """Processes fall back to threads on platforms that can't fork"""
+    if backend not in BACKENDS:
+        raise ArgumentValueError('backend', backend, BACKENDS)
+    if backend == 'process' and 'fork' in multiprocessing.get_all_start_methods():
+        return ProcessExecutor(nb_workers)
+    if backend == 'inline':
+        return InlineExecutor()
+    return ThreadExecutor(nb_workers)
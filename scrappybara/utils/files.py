@@ -1,6 +1,11 @@
 import bz2
+import contextlib
 import os
 import pickle
+import shutil
+import tempfile
+
+import numpy as np
 
 import scrappybara.config as cfg
 
@@ -42,7 +47,8 @@ def load_pkl_file(path):
 
 
 def save_pkl_file(python_object, path):
-    pickle.dump(python_object, open(path, 'wb'))
+    with open(path, 'wb') as pkl_file:
+        pickle.dump(python_object, pkl_file)
 
 
 def load_set_from_txt_file(path, value_type=str):
@@ -55,3 +61,44 @@ def load_dict_from_txt_file(path, key_type=str, value_type=str):
     """Opens a txt file and loads tab-separated columns into a dictionary"""
     with txt_file_reader(path) as txt_file:
         return {key_type(key): value_type(value) for key, value in [line.strip().split('\t') for line in txt_file]}
+
+
+@contextlib.contextmanager
+def atomic_path(path):
+    """Yields a temporary path in the same directory, moved to path once written without error.
+    Concurrent readers see either no file or the complete file, never a partial one.
+    """
+    dirname, basename = os.path.split(str(path))
+    file_descriptor, tmp_path = tempfile.mkstemp(prefix=basename + '.', suffix='.tmp', dir=dirname or None)
+    os.close(file_descriptor)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, str(path))
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def save_npy_file(array, path):
+    """Saves a numpy array atomically"""
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, 'wb') as npy_file:
+            np.save(npy_file, array)
+
+
+@contextlib.contextmanager
+def atomic_dirpath(path):
+    """Yields a temporary directory next to path, renamed to path once written without error.
+    Concurrent readers see either no directory or the complete one. A directory already at path is kept.
+    """
+    dirname, basename = os.path.split(str(path))
+    tmp_path = tempfile.mkdtemp(prefix=basename + '.', suffix='.tmp', dir=dirname or None)
+    try:
+        yield tmp_path
+        try:
+            os.rename(tmp_path, str(path))
+        except OSError:
+            if not os.path.isdir(str(path)):
+                raise
+    finally:
+        shutil.rmtree(tmp_path, ignore_errors=True)
@@ -0,0 +1,107 @@
+"""Coalesces items submitted one at a time by concurrent callers into batches.
+A dedicated thread processes a batch once it's full, or once its oldest item has waited long enough:
+callers get batch-level throughput while their latency stays bounded.
+"""
+import concurrent.futures
+import queue
+import threading
+import time
+
+import scrappybara.config as cfg
+from scrappybara.exceptions import ArgumentValueError
+
+_STOP = object()  # Stops the thread
+
+
+class MicroBatcher(object):
+
+    def __init__(self, process_batch, max_batch_size=cfg.MICRO_BATCH_SIZE, max_wait=cfg.MICRO_BATCH_WAIT):
+        """Arg process_batch takes a list of items & returns a list of outputs in the same order.
+        Arg max_wait is the maximum number of seconds an item waits for other items before its batch is processed.
+        """
+        if max_batch_size < 1:
+            raise ArgumentValueError('max_batch_size', max_batch_size, 'integers >= 1')
+        if max_wait < 0:
+            raise ArgumentValueError('max_wait', max_wait, 'numbers >= 0')
+        self.__process_batch = process_batch
+        self.__max_batch_size = max_batch_size
+        self.__max_wait = max_wait
+        self.__requests = queue.Queue()  # Tuples (item, future)
+        self.__lock = threading.Lock()
+        self.__closed = False
+        self.__nb_batches = 0
+        self.__nb_items = 0
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def submit(self, item):
+        """Returns a concurrent future of the output of the item"""
+        future = concurrent.futures.Future()
+        with self.__lock:
+            if self.__closed:
+                raise RuntimeError('Cannot submit items to a closed micro-batcher')
+            self.__requests.put((item, future))
+        return future
+
+    def close(self):
+        """Processes items already submitted, then stops the thread"""
+        with self.__lock:
+            if self.__closed:
+                return
+            self.__closed = True
+            self.__requests.put(_STOP)
+        self.__thread.join()
+
+    @property
+    def stats(self):
+        """Numbers of batches & items processed so far"""
+        with self.__lock:
+            return {
+                'batches': self.__nb_batches,
+                'items': self.__nb_items,
+                'mean_batch_size': self.__nb_items / self.__nb_batches if self.__nb_batches else 0.,
+            }
+
+    def __collect(self, request):
+        """Returns a batch of requests starting with request, & whether the thread must stop"""
+        batch = [request]
+        deadline = time.monotonic() + self.__max_wait
+        while len(batch) < self.__max_batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                request = self.__requests.get(timeout=timeout) if timeout > 0 else self.__requests.get_nowait()
+            except queue.Empty:
+                break
+            if request is _STOP:
+                return batch, True
+            batch.append(request)
+        return batch, False
+
+    def __run(self):
+        stop = False
+        while not stop:
+            request = self.__requests.get()
+            if request is _STOP:
+                break
+            batch, stop = self.__collect(request)
+            # Skip futures cancelled by their caller
+            batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                outputs = self.__process_batch([item for item, _ in batch])
+            except Exception as exception:
+                for _, future in batch:
+                    future.set_exception(exception)
+            else:
+                for (_, future), output in zip(batch, outputs):
+                    future.set_result(output)
+            with self.__lock:
+                self.__nb_batches += 1
+                self.__nb_items += len(batch)
@@ -0,0 +1,88 @@
+"""Stages run in their own thread & are chained by bounded queues:
+while a stage processes an item, the next stage processes the previous item.
+Useful when stages release the GIL (TensorFlow, NumPy, I/O) or dispatch work to pools of workers.
+"""
+import queue
+import threading
+
+_END = object()  # Marks the end of the items
+_POLL_INTERVAL = .1  # Seconds between checks of the stop event by a blocked thread
+
+
+class _Failure(object):
+    """Exception raised by a stage, passed down to the consumer"""
+
+    def __init__(self, exception):
+        self.exception = exception
+
+
+def _put(items, item, stop):
+    """Returns False if stopped before the item could be queued"""
+    while not stop.is_set():
+        try:
+            items.put(item, timeout=_POLL_INTERVAL)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(items, stop):
+    """Returns _END if stopped before an item could be dequeued"""
+    while not stop.is_set():
+        try:
+            return items.get(timeout=_POLL_INTERVAL)
+        except queue.Empty:
+            continue
+    return _END
+
+
+def _feed(items, outputs, stop):
+    try:
+        for item in items:
+            if not _put(outputs, item, stop):
+                return
+    except Exception as exception:
+        _put(outputs, _Failure(exception), stop)
+        return
+    _put(outputs, _END, stop)
+
+
+def _run_stage(stage, inputs, outputs, stop):
+    while True:
+        item = _get(inputs, stop)
+        if item is _END or isinstance(item, _Failure):
+            _put(outputs, item, stop)
+            return
+        try:
+            output = stage(item)
+        except Exception as exception:
+            output = _Failure(exception)
+        if not _put(outputs, output, stop):
+            return
+
+
+def run_stages(items, stages, queue_size=2):
+    """Passes every item through the chain of stages & yields outputs of the last one, in the same order.
+    Items can be a lazy iterable: it's consumed in a thread, & at most queue_size items wait between two stages.
+    An exception raised by a stage (or the iterable) is raised again by this generator.
+    """
+    stop = threading.Event()
+    queues = [queue.Queue(queue_size) for _ in range(len(stages) + 1)]
+    threads = [threading.Thread(target=_feed, args=(items, queues[0], stop), daemon=True)]
+    for idx, stage in enumerate(stages):
+        threads.append(threading.Thread(target=_run_stage, args=(stage, queues[idx], queues[idx + 1], stop),
+                                        daemon=True))
+    for thread in threads:
+        thread.start()
+    try:
+        while True:
+            output = queues[-1].get()
+            if output is _END:
+                return
+            if isinstance(output, _Failure):
+                raise output.exception
+            yield output
+    finally:
+        # Threads stop even if the consumer doesn't exhaust the generator
+        stop.set()
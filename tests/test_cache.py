@@ -0,0 +1,65 @@
+import threading
+import unittest
+
+from scrappybara.utils.cache import LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_hit_miss(self):
+        cache = LRUCache(10)
+        self.assertRaises(KeyError, lambda: cache['a'])
+        cache['a'] = 1
+        self.assertEqual(1, cache['a'])
+        stats = cache.stats
+        self.assertEqual(1, stats['hits'])
+        self.assertEqual(1, stats['misses'])
+        self.assertEqual(0.5, stats['hit_rate'])
+        self.assertEqual(1, stats['size'])
+
+    def test_eviction(self):
+        cache = LRUCache(2)
+        cache['a'] = 1
+        cache['b'] = 2
+        self.assertEqual(1, cache['a'])  # 'b' becomes the least recently used
+        cache['c'] = 3
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertIn('c', cache)
+        self.assertEqual(2, len(cache))
+
+    def test_disabled(self):
+        cache = LRUCache(0)
+        cache['a'] = 1
+        self.assertEqual(0, len(cache))
+
+    def test_clear(self):
+        cache = LRUCache(2)
+        cache['a'] = 1
+        _ = cache['a']
+        cache.clear()
+        self.assertEqual(0, len(cache))
+        self.assertEqual(0, cache.stats['hits'])
+
+    def test_threads(self):
+        cache = LRUCache(50)
+
+        def _work(_offset):
+            for i in range(1000):
+                key = (i + _offset) % 100
+                try:
+                    cache[key]
+                except KeyError:
+                    cache[key] = key
+
+        threads = [threading.Thread(target=_work, args=(idx,)) for idx in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(50, len(cache))
+        self.assertEqual(8000, cache.stats['hits'] + cache.stats['misses'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import pathlib
+import random
+import tempfile
+import unittest
+
+import scrappybara.config as cfg
+from scrappybara.semantics.entity_vectors import EntityVectors
+from scrappybara.utils.files import save_pkl_file
+from scrappybara.utils.maths import cosine
+
+
+class TestEntityVectors(unittest.TestCase):
+
+    def setUp(self):
+        rand = random.Random(7)
+        self.__eid_vector = {eid: {rand.randrange(50): rand.random() for _ in range(rand.randrange(1, 10))}
+                             for eid in rand.sample(range(1000), 40)}
+        self.__eid_vector[1001] = {}  # Null vector
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        EntityVectors(self.__tmp_dir.name).save(self.__eid_vector)
+        self.__vectors = EntityVectors(self.__tmp_dir.name).load()
+
+    def tearDown(self):
+        self.__tmp_dir.cleanup()
+
+    def test_cosines(self):
+        vector = {3: 0.5, 10: 1.2, 17: 0.1, 42: 2.}
+        eids = sorted(self.__eid_vector)
+        scores = self.__vectors.cosines(eids, vector)
+        for eid, score in zip(eids, scores):
+            self.assertAlmostEqual(cosine(vector, self.__eid_vector[eid]), score, places=5)
+
+    def test_batch_cosines(self):
+        vectors = [{3: 0.5, 10: 1.2}, {}, {17: 0.1, 42: 2., 49: 0.3}]
+        eids = sorted(self.__eid_vector) * 3
+        vector_ids = [vector_id for vector_id in range(3) for _ in self.__eid_vector]
+        scores = self.__vectors.batch_cosines(eids, vector_ids, vectors)
+        for eid, vector_id, score in zip(eids, vector_ids, scores):
+            self.assertAlmostEqual(cosine(vectors[vector_id], self.__eid_vector[eid]), score, places=5)
+        self.assertEqual(0, len(self.__vectors.batch_cosines([], [], [])))
+
+    def test_unknown_entity(self):
+        self.assertListEqual([-1., -1.], list(self.__vectors.cosines([1002, 1001], {3: 0.5})))
+
+    def test_conversion(self):
+        """The downloaded pkl file is converted on first load, in the directory of the current DATA_DIR"""
+        data_dir = cfg.DATA_DIR
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cfg.DATA_DIR = pathlib.Path(tmp_dir)
+            try:
+                os.mkdir(os.path.join(tmp_dir, 'entities'))
+                save_pkl_file(self.__eid_vector, os.path.join(tmp_dir, 'entities', 'eid_vector.pkl'))
+                vectors = EntityVectors().load()
+                self.assertEqual(len(self.__eid_vector), len(vectors))
+                # No temporary file is left behind
+                self.assertTrue(all(filename.endswith(('.npy', '.pkl'))
+                                    for filename in os.listdir(os.path.join(tmp_dir, 'entities'))))
+            finally:
+                cfg.DATA_DIR = data_dir
+
+    def test_null_vector(self):
+        self.assertTrue(all(score == -1 for score in self.__vectors.cosines(sorted(self.__eid_vector), {})))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import gc
+import threading
+import unittest
+import weakref
+
+from scrappybara.exceptions import ArgumentValueError
+from scrappybara.utils.executors import InlineExecutor, ProcessExecutor, ThreadExecutor, make_executor
+
+
+def _square(x):
+    return x * x
+
+
+class TestExecutors(unittest.TestCase):
+
+    def test_inline(self):
+        self.assertListEqual([0, 1, 4, 9], InlineExecutor().map(_square, range(4)))
+
+    def test_thread(self):
+        executor = ThreadExecutor(4)
+        self.assertListEqual([x * x for x in range(100)], executor.map(_square, range(100)))
+        self.assertListEqual([], executor.map(_square, []))
+        executor.close()
+
+    def test_process(self):
+        executor = ProcessExecutor(3)
+        self.assertListEqual([x * x for x in range(100)], executor.map(_square, range(100)))
+        executor.close()
+
+    def test_process_registered(self):
+        """Registered processes don't need to be picklable"""
+        lock = threading.Lock()
+        offset = 10
+
+        def _add_offset(x):
+            with lock:
+                return x + offset
+
+        executor = ProcessExecutor(2)
+        executor.register(_add_offset)
+        self.assertListEqual(list(range(10, 60)), executor.map(_add_offset, range(50)))
+        executor.close()
+
+    def test_process_started(self):
+        """Workers are forked at start: they inherit data loaded before"""
+        resource = {x: -x for x in range(1000)}
+        executor = ProcessExecutor(2)
+        executor.register(resource.get)
+        executor.start()
+        self.assertListEqual([-x for x in range(100)], executor.map(resource.get, range(100)))
+        self.assertRaises(AssertionError, lambda: executor.register(_square))
+        executor.close()
+
+    def test_process_closed(self):
+        """Closing unregisters processes, so the objects they're bound to can be collected"""
+
+        class _Resource(object):
+            def get(self, x):
+                return x
+
+        resource = _Resource()
+        resource_ref = weakref.ref(resource)
+        executor = ProcessExecutor(2)
+        executor.register(resource.get)
+        executor.start()
+        executor.close()
+        del resource
+        gc.collect()
+        self.assertIsNone(resource_ref())
+
+    def test_process_unfrozen(self):
+        """Objects are frozen only while workers are forked, so the parent can collect them"""
+        if not hasattr(gc, 'freeze'):
+            self.skipTest('gc.freeze requires python 3.7+')
+        executor = ProcessExecutor(2).start()
+        self.assertEqual(0, gc.get_freeze_count())
+        executor.close()
+
+    def test_processes_closed_in_any_order(self):
+        for first, second in [(0, 1), (1, 0)]:
+            executors = [ProcessExecutor(2).start(), ProcessExecutor(2).start()]
+            executors[first].close()
+            self.assertListEqual([x * x for x in range(20)], executors[second].map(_square, range(20)))
+            executors[second].close()
+            if hasattr(gc, 'get_freeze_count'):
+                self.assertEqual(0, gc.get_freeze_count())
+
+    def test_make_executor(self):
+        self.assertIsInstance(make_executor('inline', 4), InlineExecutor)
+        self.assertIsInstance(make_executor('thread', 4), ThreadExecutor)
+        self.assertRaises(ArgumentValueError, lambda: make_executor('gpu', 4))
+
+
+if __name__ == '__main__':
+    unittest.main()
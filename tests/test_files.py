@@ -0,0 +1,45 @@
+import os
+import tempfile
+import unittest
+
+from scrappybara.utils.files import atomic_dirpath, atomic_path
+
+
+class TestFiles(unittest.TestCase):
+
+    def setUp(self):
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        self.__path = os.path.join(self.__tmp_dir.name, 'data')
+
+    def tearDown(self):
+        self.__tmp_dir.cleanup()
+
+    def test_atomic_path(self):
+        with atomic_path(self.__path) as tmp_path:
+            with open(tmp_path, 'w') as tmp_file:
+                tmp_file.write('a')
+            self.assertFalse(os.path.exists(self.__path))
+        with open(self.__path) as data_file:
+            self.assertEqual('a', data_file.read())
+        self.assertListEqual(['data'], os.listdir(self.__tmp_dir.name))
+
+    def test_atomic_path_error(self):
+        with self.assertRaises(ValueError):
+            with atomic_path(self.__path):
+                raise ValueError()
+        self.assertListEqual([], os.listdir(self.__tmp_dir.name))
+
+    def test_atomic_dirpath(self):
+        with atomic_dirpath(self.__path) as tmp_path:
+            open(os.path.join(tmp_path, 'a'), 'w').close()
+            self.assertFalse(os.path.exists(self.__path))
+        self.assertListEqual(['a'], os.listdir(self.__path))
+        # A directory already in place is kept
+        with atomic_dirpath(self.__path) as tmp_path:
+            open(os.path.join(tmp_path, 'b'), 'w').close()
+        self.assertListEqual(['a'], os.listdir(self.__path))
+        self.assertListEqual(['data'], os.listdir(self.__tmp_dir.name))
+
+
+if __name__ == '__main__':
+    unittest.main()
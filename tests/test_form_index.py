@@ -0,0 +1,64 @@
+import os
+import pathlib
+import tempfile
+import unittest
+
+import scrappybara.config as cfg
+from scrappybara.semantics.form_index import FormIndex
+from scrappybara.utils.files import save_pkl_file
+
+_FORM_EIDS = {
+    'paris': {90, 167646, 830149},
+    'france': {142},
+    'new york city': {60},
+    'são paulo': {174},
+    'c++': {2407},
+}
+
+
+class TestFormIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        FormIndex(self.__tmp_dir.name).save(_FORM_EIDS)
+        self.__index = FormIndex(self.__tmp_dir.name).load()
+
+    def tearDown(self):
+        self.__tmp_dir.cleanup()
+
+    def test_lookup(self):
+        self.assertListEqual([90, 167646, 830149], list(self.__index['paris']))
+        self.assertListEqual([142], list(self.__index['france']))
+        self.assertListEqual([174], list(self.__index['são paulo']))
+        self.assertListEqual([2407], list(self.__index['c++']))
+
+    def test_missing(self):
+        self.assertNotIn('london', self.__index)
+        self.assertIn('new york city', self.__index)
+        self.assertRaises(KeyError, lambda: self.__index['london'])
+        self.assertIsNone(self.__index.get('new york'))
+
+    def test_mapping(self):
+        self.assertEqual(5, len(self.__index))
+        self.assertSetEqual(set(_FORM_EIDS), set(self.__index))
+        self.assertDictEqual(_FORM_EIDS, {form: set(eids) for form, eids in self.__index.items()})
+
+    def test_conversion(self):
+        """The downloaded pkl file is converted on first load, in the directory of the current DATA_DIR"""
+        data_dir = cfg.DATA_DIR
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cfg.DATA_DIR = pathlib.Path(tmp_dir)
+            try:
+                os.mkdir(os.path.join(tmp_dir, 'entities'))
+                save_pkl_file(_FORM_EIDS, os.path.join(tmp_dir, 'entities', 'form_eids.pkl'))
+                index = FormIndex().load()
+                self.assertDictEqual(_FORM_EIDS, {form: set(eids) for form, eids in index.items()})
+                # No temporary file is left behind
+                self.assertTrue(all(filename.endswith(('.npy', '.pkl'))
+                                    for filename in os.listdir(os.path.join(tmp_dir, 'entities'))))
+            finally:
+                cfg.DATA_DIR = data_dir
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from scrappybara.pipeline.async_pipeline import AsyncPipeline
+from scrappybara.utils.micro_batcher import MicroBatcher
+
+
+class _FakePipeline(object):
+    """Returns uppercased texts & records the size of batches"""
+
+    def __init__(self, delay=0.):
+        self.batch_sizes = []
+        self.__delay = delay
+
+    def __call__(self, texts):
+        time.sleep(self.__delay)
+        self.batch_sizes.append(len(texts))
+        return [text.upper() for text in texts]
+
+
+class TestMicroBatcher(unittest.TestCase):
+
+    def test_outputs(self):
+        pipe = _FakePipeline()
+        with MicroBatcher(pipe, max_batch_size=4, max_wait=.1) as batcher:
+            futures = [batcher.submit(str(idx)) for idx in range(10)]
+            self.assertListEqual([str(idx) for idx in range(10)], [future.result() for future in futures])
+        self.assertTrue(all(size <= 4 for size in pipe.batch_sizes))
+        self.assertEqual(10, sum(pipe.batch_sizes))
+
+    def test_max_wait(self):
+        """A lone item doesn't wait for a full batch"""
+        with MicroBatcher(_FakePipeline(), max_batch_size=100, max_wait=.01) as batcher:
+            self.assertEqual('A', batcher.submit('a').result(timeout=5))
+
+    def test_coalescing(self):
+        pipe = _FakePipeline()
+        barrier = threading.Barrier(8)
+        with MicroBatcher(pipe, max_batch_size=8, max_wait=.5) as batcher:
+            def _submit(text):
+                barrier.wait()
+                return batcher.submit(text).result()
+
+            threads = [threading.Thread(target=_submit, args=(str(idx),)) for idx in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(8, batcher.stats['items'])
+        self.assertLess(len(pipe.batch_sizes), 8)
+
+    def test_exception(self):
+        def _fail(items):
+            raise ValueError(items)
+
+        with MicroBatcher(_fail, max_wait=0.) as batcher:
+            with self.assertRaises(ValueError):
+                batcher.submit('a').result()
+
+    def test_close(self):
+        batcher = MicroBatcher(_FakePipeline(.01), max_batch_size=2, max_wait=0.)
+        futures = [batcher.submit(str(idx)) for idx in range(6)]
+        batcher.close()
+        self.assertTrue(all(future.done() for future in futures))
+        with self.assertRaises(RuntimeError):
+            batcher.submit('a')
+
+
+class TestAsyncPipeline(unittest.TestCase):
+
+    def test_process(self):
+        pipe = _FakePipeline()
+        texts = ['text %d' % idx for idx in range(20)]
+        loop = asyncio.new_event_loop()
+        try:
+            with AsyncPipeline(pipe, max_batch_size=8, max_wait=.1) as async_pipe:
+                async def _process_all():
+                    return await asyncio.gather(*[async_pipe.process(text) for text in texts])
+
+                docs = loop.run_until_complete(_process_all())
+        finally:
+            loop.close()
+        self.assertListEqual([text.upper() for text in texts], list(docs))
+        self.assertLess(len(pipe.batch_sizes), len(texts))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import importlib.util
+import os
+import pathlib
+import tempfile
+import unittest
+
+import numpy as np
+
+import scrappybara.config as cfg
+from scrappybara.syntax.dependencies import Dep
+from scrappybara.syntax.tags import Tag
+from scrappybara.syntax.transitions import Trans
+
+_CHARSET_SIZE = 50
+
+
+def _has_keras_2():
+    """The Keras models are written for the Keras 2 API.
+    TensorFlow 2.16+ ships Keras 3, & provides Keras 2 with the tf_keras package when TF_USE_LEGACY_KERAS is set.
+    """
+    if importlib.util.find_spec('tensorflow') is None:
+        return False
+    os.environ.setdefault('TF_USE_LEGACY_KERAS', '1')  # No effect if TensorFlow is already imported
+    import tensorflow as tf
+
+    version = tf.keras.version() if hasattr(tf.keras, 'version') else getattr(tf.keras, '__version__', '2')
+    return version.startswith('2')
+
+
+@unittest.skipUnless(_has_keras_2(), 'Models are compared to Keras 2 models')
+class TestModels(unittest.TestCase):
+    """Keras models with random weights are saved, then evaluated by the Keras & NumPy backends"""
+
+    @classmethod
+    def setUpClass(cls):
+        from scrappybara.syntax.models import PTagsModel, PDepsModel, TransModel
+
+        cls.data_dir = cfg.DATA_DIR
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cfg.DATA_DIR = pathlib.Path(cls.tmp_dir.name)
+        (cfg.DATA_DIR / 'models').mkdir()
+        cls.keras_models = [model_class(_CHARSET_SIZE) for model_class in [PTagsModel, PDepsModel, TransModel]]
+        for model in cls.keras_models:
+            model.save()
+        # Padded batch of sentences of random lengths, with words of random lengths
+        rng = np.random.RandomState(0)
+        nb_sents, padded_length = 8, 12
+        cls.char_codes = rng.randint(1, _CHARSET_SIZE, (nb_sents, padded_length, cfg.PADDED_WORD_LENGTH)).astype(np.int32)
+        cls.word_vectors = rng.normal(size=(nb_sents, padded_length, 100)).astype(np.float32)
+        cls.tag_codes = rng.randint(1, len(Tag), (nb_sents, padded_length))
+        cls.dep_codes = rng.randint(1, len(Dep), (nb_sents, padded_length))
+        for idx, length in enumerate(rng.randint(3, padded_length + 1, nb_sents)):
+            for codes in [cls.char_codes, cls.word_vectors, cls.tag_codes, cls.dep_codes]:
+                codes[idx, length:] = 0
+            cls.char_codes[idx, :length, rng.randint(3, cfg.PADDED_WORD_LENGTH):] = 0
+
+    @classmethod
+    def tearDownClass(cls):
+        cfg.DATA_DIR = cls.data_dir
+        cls.tmp_dir.cleanup()
+
+    def test_ptags(self):
+        from scrappybara.syntax.numpy_models import NumpyPTagsModel
+
+        numpy_model = NumpyPTagsModel(_CHARSET_SIZE).load()
+        np.testing.assert_array_equal(self.keras_models[0].predict(self.char_codes, self.word_vectors),
+                                      numpy_model.predict(self.char_codes, self.word_vectors))
+
+    def test_pdeps(self):
+        from scrappybara.syntax.numpy_models import NumpyPDepsModel
+
+        numpy_model = NumpyPDepsModel(_CHARSET_SIZE).load()
+        inputs = (self.tag_codes, self.char_codes, self.word_vectors)
+        np.testing.assert_array_equal(self.keras_models[1].predict(*inputs), numpy_model.predict(*inputs))
+
+    def test_trans(self):
+        from scrappybara.syntax.numpy_models import NumpyTransModel
+
+        numpy_model = NumpyTransModel(_CHARSET_SIZE).load()
+        inputs = (self.tag_codes, self.dep_codes, self.char_codes, self.word_vectors)
+        keras_encodings = self.keras_models[2].encode(*inputs)
+        numpy_encodings = numpy_model.encode(*inputs)
+        np.testing.assert_allclose(keras_encodings, numpy_encodings, atol=1e-5)
+        np.testing.assert_array_equal(self.keras_models[2].predict(keras_encodings[:, 1], keras_encodings[:, 2]),
+                                      numpy_model.predict(keras_encodings[:, 1], keras_encodings[:, 2]))
+
+    def assert_fused(self, fused_model, ptags_model, pdeps_model, trans_model):
+        """The fused pass predicts the same tags, dependencies & transitions as the models run one after another"""
+        tag_codes, dep_codes, encodings = fused_model(self.char_codes, self.word_vectors)
+        np.testing.assert_array_equal(ptags_model.predict(self.char_codes, self.word_vectors), tag_codes)
+        np.testing.assert_array_equal(pdeps_model.predict(tag_codes, self.char_codes, self.word_vectors), dep_codes)
+        separate_encodings = trans_model.encode(tag_codes, dep_codes, self.char_codes, self.word_vectors)
+        np.testing.assert_allclose(separate_encodings, encodings, atol=1e-5)
+        np.testing.assert_array_equal(trans_model.predict(separate_encodings[:, 1], separate_encodings[:, 2]),
+                                      trans_model.predict(encodings[:, 1], encodings[:, 2]))
+
+    def test_fused(self):
+        from scrappybara.syntax.models import FusedModel
+
+        self.assert_fused(FusedModel(*self.keras_models), *self.keras_models)
+
+    def test_numpy_fused(self):
+        from scrappybara.syntax.numpy_models import NumpyFusedModel, NumpyPTagsModel, NumpyPDepsModel, \
+            NumpyTransModel
+
+        numpy_models = [model_class(_CHARSET_SIZE).load()
+                        for model_class in [NumpyPTagsModel, NumpyPDepsModel, NumpyTransModel]]
+        self.assert_fused(NumpyFusedModel(*numpy_models), *numpy_models)
+
+    def assert_codes(self, codes, shape, nb_codes):
+        """Predictions are int8 arrays of codes, as _ParseSlots indexes them"""
+        self.assertIsInstance(codes, np.ndarray)
+        self.assertEqual(np.int8, codes.dtype)
+        self.assertTupleEqual(shape, codes.shape)
+        self.assertTrue(((codes >= 0) & (codes < nb_codes)).all())
+
+    def assert_encodings(self, encodings):
+        self.assertIsInstance(encodings, np.ndarray)
+        self.assertEqual(np.float32, encodings.dtype)
+        self.assertTupleEqual(self.tag_codes.shape, encodings.shape[:2])
+
+    def test_code_arrays(self):
+        from scrappybara.syntax.models import FusedModel
+        from scrappybara.syntax.numpy_models import NumpyFusedModel, NumpyPTagsModel, NumpyPDepsModel, \
+            NumpyTransModel
+
+        numpy_models = [model_class(_CHARSET_SIZE).load()
+                        for model_class in [NumpyPTagsModel, NumpyPDepsModel, NumpyTransModel]]
+        shape = self.tag_codes.shape
+        for fused_class, (ptags_model, pdeps_model, trans_model) in [(FusedModel, self.keras_models),
+                                                                      (NumpyFusedModel, numpy_models)]:
+            self.assert_codes(ptags_model.predict(self.char_codes, self.word_vectors), shape, len(Tag))
+            self.assert_codes(pdeps_model.predict(self.tag_codes, self.char_codes, self.word_vectors), shape,
+                              len(Dep))
+            encodings = trans_model.encode(self.tag_codes, self.dep_codes, self.char_codes, self.word_vectors)
+            self.assert_encodings(encodings)
+            self.assert_codes(trans_model.predict(encodings[:, 1], encodings[:, 2]), shape[:1], len(Trans))
+            tag_codes, dep_codes, encodings = fused_class(ptags_model, pdeps_model, trans_model)(self.char_codes,
+                                                                                                 self.word_vectors)
+            self.assert_codes(tag_codes, shape, len(Tag))
+            self.assert_codes(dep_codes, shape, len(Dep))
+            self.assert_encodings(encodings)
+
+
+if __name__ == '__main__':
+    unittest.main()
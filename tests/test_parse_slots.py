@@ -0,0 +1,104 @@
+import collections
+import unittest
+
+import numpy as np
+
+from scrappybara.syntax.dependencies import Dep
+from scrappybara.syntax.parser import _ParseSlots
+from scrappybara.syntax.tags import Tag
+from scrappybara.syntax.transitions import Trans
+
+
+class _Parse(object):
+    """Reference: parsing of a single sentence with lists, as before states were stored in arrays"""
+
+    def __init__(self, tag_codes, dep_codes):
+        """Codes are non-padded"""
+        self.tags = tuple([Tag(code) for code in tag_codes])
+        self.__deps = [Dep(code) for code in dep_codes]
+        self.__buffer = collections.deque([idx for idx, dep in enumerate(self.__deps) if dep != Dep.NODEP])
+        self.__stack = []
+        if self.__buffer:
+            self.__stack.append(self.__buffer.popleft())
+        self.arcs = []
+
+    def __pdep(self, child_idx):
+        return Dep.SPLIT if self.__deps[child_idx] == Dep.ROOT else self.__deps[child_idx]
+
+    def __reduce(self):
+        self.__stack.pop()
+        if not self.__stack:
+            self.__stack.append(self.__buffer.popleft())
+
+    @property
+    def complete(self):
+        return not self.__buffer
+
+    @property
+    def root(self):
+        roots = {parent for _, parent, _ in self.arcs} - {child for _, _, child in self.arcs}
+        return min(roots) if roots else None
+
+    def register_transition(self, trans):
+        if trans == Trans.LEFT:
+            self.arcs.append((self.__pdep(self.__stack[-1]), self.__buffer[0], self.__stack[-1]))
+            self.__reduce()
+        elif trans == Trans.RIGHT:
+            self.arcs.append((self.__pdep(self.__buffer[0]), self.__stack[-1], self.__buffer[0]))
+            self.__stack.append(self.__buffer.popleft())
+        elif trans == Trans.REDUCE:
+            self.__reduce()
+        elif trans == Trans.SHIFT:
+            self.__stack.append(self.__buffer.popleft())
+
+
+def _pad(codes_list, padded_length):
+    """Adds start & end codes, then pads"""
+    padded = np.zeros((len(codes_list), padded_length), dtype=np.int8)
+    for idx, codes in enumerate(codes_list):
+        padded[idx, 1:len(codes) + 1] = codes
+    return padded
+
+
+class TestParseSlots(unittest.TestCase):
+
+    def parse(self, tag_codes_list, dep_codes_list, draw_transitions, padded_length):
+        """Returns results of slots & of the reference, driven by the same transitions"""
+        nb_sents = len(tag_codes_list)
+        slots = np.arange(nb_sents)
+        parse_slots = _ParseSlots(nb_sents, padded_length)
+        parse_slots.admit(slots, np.array([len(codes) + 2 for codes in tag_codes_list]),
+                          _pad(tag_codes_list, padded_length), _pad(dep_codes_list, padded_length),
+                          np.zeros((nb_sents, padded_length, 2), dtype=np.float32))
+        parses = [_Parse(tag_codes, dep_codes) for tag_codes, dep_codes in zip(tag_codes_list, dep_codes_list)]
+        incomplete = parse_slots.incomplete
+        while incomplete.size:
+            self.assertListEqual([idx for idx, parse in enumerate(parses) if not parse.complete], incomplete.tolist())
+            transitions = draw_transitions(len(incomplete))
+            parse_slots.register_transitions(incomplete, transitions)
+            for slot, trans in zip(incomplete.tolist(), transitions.tolist()):
+                parses[slot].register_transition(Trans(trans))
+            incomplete = parse_slots.incomplete
+        self.assertListEqual(slots.tolist(), parse_slots.complete.tolist())
+        return parse_slots.release(slots), [(parse.tags, parse.root, tuple(parse.arcs)) for parse in parses]
+
+    def test_left_after_right(self):
+        """Tokens attached by a right arc get another parent from a left arc: more arcs than tokens"""
+        transitions = iter([Trans.RIGHT, Trans.LEFT] * 10)
+        results, expected = self.parse([[1] * 6], [[3] * 6], lambda nb: np.array([next(transitions)] * nb), 8)
+        self.assertListEqual(expected, results)
+        self.assertGreater(len(results[0][2]), 8)
+
+    def test_random_transitions(self):
+        rng = np.random.RandomState(0)
+        lengths = rng.randint(1, 20, 50)
+        tag_codes_list = [rng.randint(1, len(Tag), length).tolist() for length in lengths]
+        dep_codes_list = [rng.randint(1, len(Dep), length).tolist() for length in lengths]
+        for transitions in [[Trans.LEFT, Trans.RIGHT], list(Trans)]:
+            results, expected = self.parse(tag_codes_list, dep_codes_list,
+                                           lambda nb: rng.choice(np.array(transitions), nb), max(lengths) + 2)
+            self.assertListEqual(expected, results)
+
+
+if __name__ == '__main__':
+    unittest.main()
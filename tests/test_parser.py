@@ -0,0 +1,101 @@
+import unittest
+
+import numpy as np
+
+from scrappybara.syntax.dependencies import Dep
+from scrappybara.syntax.parser import Parser
+from scrappybara.syntax.tags import Tag
+from scrappybara.syntax.transitions import Trans
+from scrappybara.utils.cache import LRUCache
+
+
+class _Charset(object):
+
+    def encode(self, text):
+        return np.array([ord(char) % 50 + 1 for char in text], dtype=np.int32)
+
+
+class _Wordset(object):
+
+    def vectors(self, tokens):
+        return np.zeros((len(tokens), 100), dtype=np.float32)
+
+
+class _FusedModel(object):
+    """Every token is a noun attached by AND. Records the number of sentences it's given."""
+
+    def __init__(self):
+        self.nb_sentences = 0
+
+    def __call__(self, char_codes, word_vectors):
+        self.nb_sentences += len(char_codes)
+        shape = char_codes.shape[:2]
+        return (np.full(shape, Tag.NOUN, dtype=np.int8), np.full(shape, Dep.AND, dtype=np.int8),
+                np.zeros(shape + (4,), dtype=np.float32))
+
+
+class _TransModel(object):
+    """Always attaches the buffer's head to the stack's top"""
+
+    def predict(self, encodings_1, encodings_2):
+        return np.full(len(encodings_1), Trans.RIGHT, dtype=np.int8)
+
+
+def _make_parser(batch_size=4, cache_size=100):
+    """Parser with stub models, no data is loaded"""
+    parser = object.__new__(Parser)
+    parser._Parser__batch_size = batch_size
+    parser._Parser__cache = LRUCache(cache_size)
+    parser._Parser__charset = _Charset()
+    parser._Parser__wordset = _Wordset()
+    parser._Parser__trans_model = _TransModel()
+    parser._Parser__fused_model = _FusedModel()
+    return parser
+
+
+class TestParser(unittest.TestCase):
+
+    def test_parse(self):
+        tags, trees = _make_parser()([['a', 'b', 'c']])
+        self.assertListEqual([[Tag.NOUN] * 3], tags)
+        self.assertEqual(0, trees[0].root)
+        self.assertListEqual([(Dep.AND, 0, 1), (Dep.AND, 1, 2)], sorted(trees[0]))
+
+    def test_duplicates(self):
+        """Identical sentences are parsed once"""
+        parser = _make_parser()
+        sentences = [['a', 'b'], ['c', 'd', 'e'], ['a', 'b'], ['a', 'b'], ['c', 'd', 'e']]
+        tags, trees = parser(sentences)
+        self.assertEqual(2, parser._Parser__fused_model.nb_sentences)
+        self.assertListEqual([len(tokens) for tokens in sentences], [len(sent_tags) for sent_tags in tags])
+        self.assertListEqual([len(tokens) for tokens in sentences], [len(tree) for tree in trees])
+        self.assertEqual(2, parser.cache_stats['misses'])
+
+    def test_memo(self):
+        """Parses are memoized across calls"""
+        parser = _make_parser()
+        parser([['a', 'b'], ['c']])
+        parser([['c'], ['a', 'b'], ['d', 'e']])
+        self.assertEqual(3, parser._Parser__fused_model.nb_sentences)
+        self.assertEqual(2, parser.cache_stats['hits'])
+
+    def test_copies(self):
+        """Tags & trees of identical sentences are independent copies, in a call & across calls"""
+        parser = _make_parser()
+        tags, trees = parser([['a', 'b'], ['a', 'b']])
+        self.assertIsNot(tags[0], tags[1])
+        self.assertIsNot(trees[0], trees[1])
+        tags[0][0] = Tag.VERB
+        trees[0].register_child(Dep.OBJ, 1, 2)
+        self.assertListEqual([Tag.NOUN] * 2, tags[1])
+        self.assertEqual(2, len(trees[1]))
+        new_tags, new_trees = parser([['a', 'b']])
+        self.assertListEqual([Tag.NOUN] * 2, new_tags[0])
+        self.assertListEqual([(Dep.AND, 0, 1)], list(new_trees[0]))
+
+    def test_empty(self):
+        self.assertTupleEqual(([], []), _make_parser()([]))
+
+
+if __name__ == '__main__':
+    unittest.main()
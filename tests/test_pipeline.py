@@ -0,0 +1,92 @@
+import threading
+import unittest
+
+from scrappybara.pipeline.pipeline import Pipeline
+from scrappybara.utils.executors import make_executor
+
+
+class _EntityLinker(object):
+    """Entities are the texts of nodes"""
+
+    def link_batch(self, node_lists, texts, executor=None):
+        return [list(nodes) for nodes in node_lists]
+
+
+def _process_sentence(sentence_pack):
+    tokens, _, _ = sentence_pack
+    if 'fail' in tokens:
+        raise ValueError(tokens)
+    return dict(enumerate(tokens))
+
+
+def _make_pipeline(backend='thread'):
+    """Pipeline with stub stages: sentences are whitespace-separated tokens, parsing records its batches"""
+    pipe = object.__new__(Pipeline)
+    parsed_batches = []
+
+    def _parse(token_lists):
+        parsed_batches.append(len(token_lists))
+        return [None] * len(token_lists), [None] * len(token_lists)
+
+    executor = make_executor(backend, 2).start()
+    pipe._Pipeline__sentencize = lambda text: [text.split()] if text else []
+    pipe._Pipeline__parse = _parse
+    pipe._Pipeline__link_entities = _EntityLinker()
+    pipe._Pipeline__gpu_batch_size = -1
+    pipe._Pipeline__parser_backend = 'numpy'
+    pipe._Pipeline__result_cache = None
+    pipe._Pipeline__executors = {'sentencize': executor, 'process_sentence': executor, 'link': executor}
+    pipe._process_sentence = _process_sentence
+    pipe._Pipeline__stages = [pipe._Pipeline__sentencize_batch, pipe._Pipeline__parse_batch,
+                              pipe._Pipeline__process_batch, pipe._Pipeline__link_batch]
+    return pipe, parsed_batches
+
+
+class TestPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.pipe, self.parsed_batches = _make_pipeline()
+
+    def tearDown(self):
+        self.pipe.close()
+
+    def test_call(self):
+        docs = self.pipe(['a b', '', 'c'])
+        self.assertListEqual([['a', 'b'], [], ['c']], [doc.entities for doc in docs])
+
+    def test_iter_documents_order(self):
+        texts = ['text %d' % idx for idx in range(100)]
+        docs = list(self.pipe.iter_documents(iter(texts), batch_size=7))
+        self.assertListEqual([text.split() for text in texts], [doc.entities for doc in docs])
+
+    def test_iter_documents_batches(self):
+        """Texts are consumed by micro-batches of batch_size texts, the last one can be smaller"""
+        for nb_texts, batch_sizes in [(0, []), (5, [5]), (10, [5, 5]), (11, [5, 5, 1])]:
+            self.parsed_batches.clear()
+            docs = list(self.pipe.iter_documents(('x%d' % idx for idx in range(nb_texts)), batch_size=5))
+            self.assertEqual(nb_texts, len(docs))
+            self.assertListEqual(batch_sizes, self.parsed_batches)
+
+    def test_iter_documents_failure(self):
+        """A failing stage raises its exception to the consumer, without hanging"""
+        texts = ['a'] * 20 + ['fail'] + ['b'] * 20
+        docs = []
+        result = {}
+
+        def _consume():
+            try:
+                for doc in self.pipe.iter_documents(texts, batch_size=4):
+                    docs.append(doc)
+            except ValueError as exception:
+                result['exception'] = exception
+
+        thread = threading.Thread(target=_consume, daemon=True)
+        thread.start()
+        thread.join(10)
+        self.assertFalse(thread.is_alive())
+        self.assertIsInstance(result.get('exception'), ValueError)
+        self.assertEqual(20, len(docs))
+
+
+if __name__ == '__main__':
+    unittest.main()
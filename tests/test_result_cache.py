@@ -0,0 +1,69 @@
+import pathlib
+import tempfile
+import unittest
+
+from scrappybara.pipeline.document import Document
+from scrappybara.pipeline.result_cache import ResultCache
+from scrappybara.semantics.resources import Entity
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        self.__path = pathlib.Path(self.__tmp_dir.name) / 'cache.sqlite'
+
+    def tearDown(self):
+        self.__tmp_dir.cleanup()
+
+    def test_hit_miss(self):
+        cache = ResultCache(self.__path)
+        self.assertListEqual([None, None], cache.get_many(['a', 'b']))
+        cache.put_many(['a'], [Document([Entity(90, 'Paris', 0, 5)])])
+        doc_a, doc_b = cache.get_many(['a', 'b'])
+        self.assertIsNone(doc_b)
+        self.assertEqual(90, doc_a.entities[0].id)
+        self.assertEqual((0, 5), (doc_a.entities[0].start_idx, doc_a.entities[0].end_idx))
+        stats = cache.stats
+        self.assertEqual(1, stats['hits'])
+        self.assertEqual(3, stats['misses'])
+        cache.close()
+
+    def test_persistence(self):
+        cache = ResultCache(self.__path)
+        cache.put_many(['a'], [Document([])])
+        cache.close()
+        cache = ResultCache(self.__path)
+        self.assertEqual(1, len(cache))
+        self.assertIsNotNone(cache.get_many(['a'])[0])
+        self.assertGreater(cache.stats['size'], 0)
+        cache.close()
+
+    def test_eviction(self):
+        cache = ResultCache(self.__path)
+        cache.put_many(['a'], [Document([])])
+        size = cache.stats['size']
+        cache.close()
+        cache = ResultCache(self.__path, 2 * size)
+        cache.put_many(['b'], [Document([])])
+        cache.get_many(['a'])
+        cache.put_many(['c'], [Document([])])
+        self.assertEqual(2, len(cache))
+        self.assertListEqual([True, False, True], [doc is not None for doc in cache.get_many(['a', 'b', 'c'])])
+        cache.close()
+
+    def test_settings(self):
+        """Documents cached with other settings aren't returned"""
+        cache = ResultCache(self.__path, settings=['parser_backend=keras'])
+        cache.put_many(['a'], [Document([])])
+        cache.close()
+        cache = ResultCache(self.__path, settings=['parser_backend=numpy'])
+        self.assertIsNone(cache.get_many(['a'])[0])
+        cache.close()
+        cache = ResultCache(self.__path, settings=['parser_backend=keras'])
+        self.assertIsNotNone(cache.get_many(['a'])[0])
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import http.client
+import json
+import threading
+import unittest
+import urllib.error
+import urllib.request
+
+from scrappybara.cli.serve import InferenceServer
+from scrappybara.pipeline.document import Document
+from scrappybara.semantics.resources import Entity
+
+
+def _fake_pipeline(texts):
+    """Every word starting with an uppercase letter is an entity"""
+    docs = []
+    for text in texts:
+        if text == 'fail':
+            raise ValueError(text)
+        entities = []
+        start = 0
+        for word in text.split(' '):
+            if word[:1].isupper():
+                entities.append(Entity(len(word), word, start, start + len(word)))
+            start += len(word) + 1
+        docs.append(Document(entities))
+    return docs
+
+
+class TestServe(unittest.TestCase):
+
+    def setUp(self):
+        self.server = InferenceServer(_fake_pipeline, port=0, max_batch_size=4, max_wait=.01,
+                                      max_body_size=1000)
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(.01,), daemon=True)
+        self.thread.start()
+        self.url = 'http://%s:%d' % self.server.server_address[:2]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def request(self, path, body=None):
+        """Returns status & decoded JSON body"""
+        data = None if body is None else json.dumps(body).encode('utf-8')
+        try:
+            with urllib.request.urlopen(self.url + path, data) as response:
+                return response.status, json.loads(response.read().decode('utf-8'))
+        except urllib.error.HTTPError as error:
+            return error.code, json.loads(error.read().decode('utf-8'))
+
+    def test_process(self):
+        status, body = self.request('/process', {'texts': ['I live in Paris', 'no entity']})
+        self.assertEqual(200, status)
+        self.assertListEqual([{'entities': [
+            {'id': 1, 'uri': 'https://www.wikidata.org/wiki/Q1', 'form': 'I', 'boundaries': [0, 1]},
+            {'id': 5, 'uri': 'https://www.wikidata.org/wiki/Q5', 'form': 'Paris', 'boundaries': [10, 15]},
+        ]}, {'entities': []}], body['documents'])
+
+    def test_invalid_body(self):
+        self.assertEqual(400, self.request('/process', {'text': 'Paris'})[0])
+        self.assertEqual(400, self.request('/process', {'texts': [1]})[0])
+
+    def post(self, headers, body=b''):
+        """Sends raw headers & body to /process, returns status"""
+        connection = http.client.HTTPConnection(*self.server.server_address[:2], timeout=10)
+        try:
+            connection.putrequest('POST', '/process')
+            for name, value in headers.items():
+                connection.putheader(name, value)
+            connection.endheaders(body)
+            return connection.getresponse().status
+        finally:
+            connection.close()
+
+    def test_content_length(self):
+        body = json.dumps({'texts': ['Paris']}).encode('utf-8')
+        self.assertEqual(200, self.post({'Content-Length': str(len(body))}, body))
+        self.assertEqual(400, self.post({}, body))
+        self.assertEqual(400, self.post({'Content-Length': 'abc'}, body))
+        self.assertEqual(400, self.post({'Content-Length': '-1'}, body))
+        self.assertEqual(413, self.post({'Content-Length': '1001'}, b' ' * 1001))
+        self.assertEqual(413, self.post({'Content-Length': str(10 ** 12)}))
+
+    def test_error(self):
+        self.assertEqual(500, self.request('/process', {'texts': ['fail']})[0])
+
+    def test_unknown_path(self):
+        self.assertEqual(404, self.request('/unknown')[0])
+
+    def test_health(self):
+        self.assertEqual((200, {'status': 'ok'}), self.request('/health'))
+
+    def test_metrics(self):
+        texts = ['Text %d' % idx for idx in range(10)]
+        self.request('/process', {'texts': texts})
+        status, metrics = self.request('/metrics')
+        self.assertEqual(200, status)
+        self.assertEqual(1, metrics['requests'])
+        self.assertEqual(10, metrics['texts'])
+        self.assertEqual(10, metrics['batcher']['items'])
+        self.assertGreaterEqual(metrics['batcher']['batches'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import threading
+import time
+import unittest
+
+from scrappybara.utils.stages import run_stages
+
+
+class TestStages(unittest.TestCase):
+
+    def test_order(self):
+        outputs = run_stages(iter(range(100)), [lambda x: x + 1, lambda x: x * 2], queue_size=3)
+        self.assertListEqual([(x + 1) * 2 for x in range(100)], list(outputs))
+
+    def test_no_stage(self):
+        self.assertListEqual([1, 2, 3], list(run_stages([1, 2, 3], [])))
+
+    def test_overlap(self):
+        """Stages process different items at the same time"""
+        running = set()
+        overlaps = []
+        lock = threading.Lock()
+
+        def _make_stage(name):
+            def _stage(item):
+                with lock:
+                    running.add(name)
+                    overlaps.append(len(running))
+                time.sleep(.01)
+                with lock:
+                    running.discard(name)
+                return item
+
+            return _stage
+
+        self.assertListEqual(list(range(20)), list(run_stages(range(20), [_make_stage('a'), _make_stage('b')])))
+        self.assertGreater(max(overlaps), 1)
+
+    def test_exception(self):
+        def _fail(x):
+            if x == 5:
+                raise ValueError(x)
+            return x
+
+        outputs = []
+        with self.assertRaises(ValueError):
+            for output in run_stages(range(10), [_fail]):
+                outputs.append(output)
+        self.assertListEqual([0, 1, 2, 3, 4], outputs)
+
+    def test_early_stop(self):
+        outputs = run_stages(range(1000), [lambda x: x])
+        self.assertEqual(0, next(outputs))
+        outputs.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
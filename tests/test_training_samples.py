@@ -0,0 +1,106 @@
+import pathlib
+import tempfile
+import unittest
+import zlib
+
+import numpy as np
+
+import scrappybara.config as cfg
+from scrappybara.syntax.charset import Charset
+from scrappybara.syntax.training_samples import SentenceTooLongError, vectorize_sentence, vectorize_sentences
+from scrappybara.utils.files import save_pkl_file
+
+
+# Reference: vectorization of a single sentence with lists, as before batches were vectorized at once
+# -------------------------------------------------------------------------->
+
+def _pad_array(array, dim):
+    result = np.zeros(dim, dtype=np.int32)
+    array = np.array(array[-dim:], dtype=np.int32)
+    result[:len(array)] = array
+    return result
+
+
+def _fill_columns(matrix, dim):
+    result = (np.zeros((len(matrix), dim), dtype=np.int32))
+    for idx, array in enumerate(matrix):
+        result[idx] = _pad_array(array, dim)
+    return result
+
+
+def _reference_vectorize(tokens, charset, wordset):
+    if len(tokens) > cfg.MAX_SENT_LENGTH:
+        raise SentenceTooLongError()
+    tokens = ['ʃʃʃ'] + tokens + ['ʄʄʄ']
+    words = ['†' + (token[len(token) - cfg.MAX_WORD_LENGTH:] if len(token) > cfg.MAX_WORD_LENGTH else token) + '‡'
+             for token in tokens]
+    char_codes = np.concatenate((
+        _fill_columns([[charset[char] for char in word] for word in words][:cfg.PADDED_SENT_LENGTH],
+                      cfg.PADDED_WORD_LENGTH),
+        _fill_columns([[] for _ in range(cfg.PADDED_SENT_LENGTH - len(words))], cfg.PADDED_WORD_LENGTH)))
+    word_vectors = np.zeros((cfg.PADDED_SENT_LENGTH, cfg.WORD_VECTOR_SIZE), dtype=np.float32)
+    for idx, token in enumerate(tokens):
+        word_vectors[idx] = wordset[token]
+    return len(tokens), char_codes, word_vectors
+
+
+class _Wordset(object):
+    """Vector of a token is drawn from its hash"""
+
+    def __getitem__(self, token):
+        return np.random.RandomState(zlib.crc32(token.encode(cfg.ENCODING))).normal(
+            size=cfg.WORD_VECTOR_SIZE).astype(np.float32)
+
+    def vectors(self, tokens):
+        return np.array([self[token] for token in tokens], dtype=np.float32).reshape((-1, cfg.WORD_VECTOR_SIZE))
+
+
+class TestTrainingSamples(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        data_dir = cfg.DATA_DIR
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cfg.DATA_DIR = pathlib.Path(tmp_dir)
+            try:
+                (cfg.DATA_DIR / 'models').mkdir()
+                save_pkl_file({char: code + 1 for code, char in enumerate('abcdefghijklmnopqrstuvwxyz.,†‡ʃʄ')},
+                              cfg.DATA_DIR / 'models' / 'char_codes.pkl')
+                cls.charset = Charset().load()
+            finally:
+                cfg.DATA_DIR = data_dir
+        cls.wordset = _Wordset()
+
+    def assert_reference(self, token_lists):
+        seq_lengths, char_codes, word_vectors = vectorize_sentences(token_lists, self.charset, self.wordset)
+        self.assertTupleEqual((len(token_lists), cfg.PADDED_SENT_LENGTH, cfg.PADDED_WORD_LENGTH), char_codes.shape)
+        self.assertTupleEqual((len(token_lists), cfg.PADDED_SENT_LENGTH, cfg.WORD_VECTOR_SIZE), word_vectors.shape)
+        for idx, tokens in enumerate(token_lists):
+            seq_length, sent_char_codes, sent_word_vectors = _reference_vectorize(tokens, self.charset, self.wordset)
+            self.assertEqual(seq_length, seq_lengths[idx])
+            np.testing.assert_array_equal(sent_char_codes, char_codes[idx])
+            np.testing.assert_array_equal(sent_word_vectors, word_vectors[idx])
+
+    def test_batch(self):
+        """Unknown chars, long words & a sentence of maximum length"""
+        self.assert_reference([['the', 'cat', 'sat', '.'], ['Über', 'straße', '!'], ['a' * 40, 'b'],
+                               ['x'] * cfg.MAX_SENT_LENGTH])
+
+    def test_empty_sentences(self):
+        self.assert_reference([[], ['a'], []])
+        self.assert_reference([])
+
+    def test_single_sentence(self):
+        tokens = ['the', 'cat']
+        for array, reference in zip(vectorize_sentence(tokens, self.charset, self.wordset),
+                                    _reference_vectorize(tokens, self.charset, self.wordset)):
+            np.testing.assert_array_equal(reference, array)
+
+    def test_too_long(self):
+        """Sentences that don't fit in the padded length are rejected"""
+        with self.assertRaises(SentenceTooLongError):
+            vectorize_sentences([['a'], ['x'] * (cfg.PADDED_SENT_LENGTH - 1)], self.charset, self.wordset)
+
+
+if __name__ == '__main__':
+    unittest.main()
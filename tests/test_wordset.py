@@ -0,0 +1,78 @@
+import os
+import pathlib
+import tempfile
+import unittest
+
+import numpy as np
+
+import scrappybara.config as cfg
+from scrappybara.syntax.wordset import Wordset
+from scrappybara.utils.files import save_pkl_file
+
+
+class _LanguageModel(object):
+    """Knows a fixed set of words"""
+
+    def __init__(self, words):
+        self.__words = set(words)
+
+    def has_ngram(self, ngram, min_count=1):
+        return ngram in self.__words
+
+    def best_ngram(self, *ngrams):
+        for ngram in ngrams:
+            if ngram in self.__words:
+                return ngram
+        return None
+
+
+class TestWordset(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.__word_vector = {word: rng.normal(size=cfg.WORD_VECTOR_SIZE).astype(np.float32)
+                              for word in ['paris', 'color', 'the', 'city']}
+        self.__data_dir = cfg.DATA_DIR
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        cfg.DATA_DIR = pathlib.Path(self.__tmp_dir.name)
+        os.mkdir(cfg.DATA_DIR / 'models')
+        save_pkl_file(self.__word_vector, cfg.DATA_DIR / 'models' / 'word_vectors.pkl')
+        self.__wordset = Wordset(_LanguageModel(self.__word_vector)).load()
+
+    def tearDown(self):
+        cfg.DATA_DIR = self.__data_dir
+        self.__tmp_dir.cleanup()
+
+    def test_conversion(self):
+        self.assertEqual(len(self.__word_vector) + 1, len(self.__wordset))
+        filenames = set(os.listdir(cfg.DATA_DIR / 'models'))
+        self.assertSetEqual({'word_vectors.pkl', 'word_ids.pkl', 'word_vectors.npy'}, filenames)
+        # Converted files are loaded as they are
+        self.assertEqual(len(self.__wordset), len(Wordset(_LanguageModel([])).load()))
+
+    def test_vectors(self):
+        """Tokens are standardized, unknown words get row 0: the zero vector"""
+        tokens = ['Paris', 'colour', 'unknown', 'the']
+        ids = self.__wordset.ids(tokens)
+        self.assertEqual(np.int32, ids.dtype)
+        self.assertEqual(0, ids[2])
+        self.assertTrue(all(ids[[0, 1, 3]] > 0))
+        vectors = self.__wordset.vectors(tokens)
+        self.assertTupleEqual((4, cfg.WORD_VECTOR_SIZE), vectors.shape)
+        np.testing.assert_array_equal(self.__word_vector['paris'], vectors[0])
+        np.testing.assert_array_equal(self.__word_vector['color'], vectors[1])
+        np.testing.assert_array_equal(np.zeros(cfg.WORD_VECTOR_SIZE), vectors[2])
+        np.testing.assert_array_equal(self.__word_vector['the'], self.__wordset['the'])
+
+    def test_memo(self):
+        """Token => id is memoized on the raw token"""
+        self.__wordset.ids(['Paris', 'city', 'Paris'])
+        self.__wordset.ids(['city'])
+        stats = self.__wordset.cache_stats
+        self.assertEqual(2, stats['misses'])
+        self.assertEqual(2, stats['hits'])
+        self.assertEqual(2, self.__wordset.standardizer_cache_stats['misses'])
+
+
+if __name__ == '__main__':
+    unittest.main()